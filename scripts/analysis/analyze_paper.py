@@ -7,111 +7,26 @@ from datetime import datetime
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-def load_rules(rules_file):
-    """加载分析规则"""
-    with open(rules_file, "r", encoding="utf-8") as f:
-        return json.load(f)
+from scripts.analysis.document import Document, as_document
+from scripts.analysis.rule_set import CompiledRuleSet, get_rule_set
 
-def find_code_blocks(text, rules):
-    """查找代码块"""
-    code_blocks = []
-    
-    # 使用规则中定义的模式查找代码块
-    for pattern in rules["code_analysis"]["patterns"]:
-        matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL)
-        for match in matches:
-            code_blocks.append({
-                "content": match.group(0),
-                "start": match.start(),
-                "end": match.end()
-            })
-    
-    # 使用关键词查找可能包含代码的段落
-    for keyword in rules["code_analysis"]["keywords"]:
-        pattern = f"[^.]*{keyword}[^.]*\."
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            code_blocks.append({
-                "content": match.group(0),
-                "start": match.start(),
-                "end": match.end()
-            })
-    
-    return code_blocks
+# 报告中保留的证据、创新方法和改进点数量
+MAX_EVIDENCE = 3
+MAX_INNOVATION_ITEMS = 3
+# 实现类型判定为高置信度所需的匹配次数
+HIGH_CONFIDENCE_COUNT = 3
 
-def analyze_implementation_type(code_blocks, rules):
-    """分析代码实现类型"""
-    # 定义判断标准
-    official_indicators = [
-        r"official.*implementation",
-        r"our.*implementation",
-        r"we.*implement",
-        r"our.*code",
-        r"code.*available",
-        r"github\.com",
-        r"source.*code",
-        r"implementation.*details"
-    ]
-    
-    unofficial_indicators = [
-        r"unofficial.*implementation",
-        r"third.party.*implementation",
-        r"reimplementation",
-        r"reproduce"
-    ]
-    
-    # 初始化计数器
-    official_count = 0
-    unofficial_count = 0
-    evidence = []
-    code_url = None
-    
-    # 分析每个代码块
-    for block in code_blocks:
-        content = block["content"].lower()
-        
-        # 检查是否包含代码链接
-        urls = re.findall(r'https?://[^\s<>"]+|www\.[^\s<>"]+', content)
-        if urls and not code_url:
-            code_url = urls[0]
-        
-        # 检查官方实现指标
-        for indicator in official_indicators:
-            if re.search(indicator, content, re.IGNORECASE):
-                official_count += 1
-                evidence.append(content.strip())
-                break
-                
-        # 检查非官方实现指标
-        for indicator in unofficial_indicators:
-            if re.search(indicator, content, re.IGNORECASE):
-                unofficial_count += 1
-                evidence.append(content.strip())
-                break
-    
-    # 根据证据确定类型和置信度
-    if official_count > unofficial_count:
-        impl_type = "official"
-        confidence = "high" if official_count >= 2 else "medium"
-    elif unofficial_count > 0:
-        impl_type = "unofficial"
-        confidence = "high" if unofficial_count >= 2 else "medium"
-    else:
-        impl_type = "unknown"
-        confidence = "low"
-    
-    return {
-        "type": impl_type,
-        "confidence": confidence,
-        "code_url": code_url,
-        "evidence": evidence[:3]  # 只保留前三条证据
-    }
+def resolve_rule_set(rules):
+    """接受已编译的规则或规则文件路径，返回已编译的规则（同一文件只编译一次）"""
+    if isinstance(rules, CompiledRuleSet):
+        return rules
+    return get_rule_set(rules)
 
 def extract_paper_info(text):
     """从文本中提取论文的基本信息。
     
     Args:
-        text (str): 预处理后的论文文本
+        text (Document | str): 已解析的文档或预处理后的论文文本
         
     Returns:
         dict: 包含标题、作者和机构信息的字典
@@ -123,8 +38,8 @@ def extract_paper_info(text):
     }
     
     try:
-        # 按段落分割文本
-        paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+        # 只需要开头的段落：标题、作者和机构都在前10个非空段落中查找
+        paragraphs = as_document(text).leading_paragraphs(10)
         
         # 提取标题（通常是第一段，但需要排除一些特殊情况）
         title_blacklist = [
@@ -292,14 +207,18 @@ def extract_paper_info(text):
     
     return info
 
-def analyze_code_implementation(text, rules_file):
+def analyze_code_implementation(text, rules, spans=None):
     """
-    分析论文中的代码实现类型
+    分析论文中的代码实现类型，提供预处理区间时只在链接区间中查找代码链接
+    
+    text 可以是已解析的文档（Document，区间取自文档）或预处理后的文本，
+    rules 可以是已编译的规则（CompiledRuleSet）或规则文件路径。
+    
+    实现类型由全文的官方/非官方匹配次数比较得出，未扫描部分的匹配可能改变判定，
+    因此总是扫描全文，没有短路模式。
     """
-    # 加载分析规则
-    rules = load_rules(rules_file)
-    if not rules:
-        return None
+    # 获取已编译的分析规则
+    rule_set = resolve_rule_set(rules)
         
     result = {
         "type": "unknown",  # 可能的值: official, unofficial, unknown
@@ -309,8 +228,9 @@ def analyze_code_implementation(text, rules_file):
     }
     
     try:
-        # 按段落分割文本
-        paragraphs = text.split("\n\n")
+        # 段落边界取自共享的文档结构，直接在文本缓冲区上按段落区间匹配
+        document = as_document(text, spans)
+        text = document.text
         
         # 计数器
         official_count = 0
@@ -320,114 +240,54 @@ def analyze_code_implementation(text, rules_file):
         official_evidence = []
         unofficial_evidence = []
         
-        # 查找代码链接
-        code_patterns = [
-            r"https?://github\.com/[^\s\)]+",
-            r"https?://gitlab\.com/[^\s\)]+",
-            r"https?://bitbucket\.org/[^\s\)]+",
-            r"https?://code\.google\.com/[^\s\)]+",
-            r"https?://sourceforge\.net/[^\s\)]+",
-            r"https?://huggingface\.co/[^\s\)]+",
-            r"https?://paperswithcode\.com/[^\s\)]+",
-            r"https?://zenodo\.org/[^\s\)]+",
-            r"https?://figshare\.com/[^\s\)]+",
-            r"https?://drive\.google\.com/[^\s\)]+",
-            r"https?://dropbox\.com/[^\s\)]+",
-            r"https?://onedrive\.live\.com/[^\s\)]+",
-            r"https?://box\.com/[^\s\)]+",
-            r"https?://mega\.nz/[^\s\)]+",
-            r"https?://colab\.research\.google\.com/[^\s\)]+",
-            r"https?://kaggle\.com/[^\s\)]+",
-            r"https?://wandb\.ai/[^\s\)]+",
-            r"https?://neptune\.ai/[^\s\)]+",
-            r"https?://mlflow\.org/[^\s\)]+",
-            r"https?://dvc\.org/[^\s\)]+",
-            r"https?://weights\.biases\.com/[^\s\)]+",
-            r"https?://tensorboard\.dev/[^\s\)]+",
-            r"https?://tensorboard\.org/[^\s\)]+",
-            r"https?://tensorflow\.org/[^\s\)]+",
-            r"https?://pytorch\.org/[^\s\)]+",
-            r"https?://keras\.io/[^\s\)]+",
-            r"https?://scikit-learn\.org/[^\s\)]+",
-            r"https?://scipy\.org/[^\s\)]+",
-            r"https?://numpy\.org/[^\s\)]+",
-            r"https?://pandas\.pydata\.org/[^\s\)]+",
-            r"https?://matplotlib\.org/[^\s\)]+",
-            r"https?://seaborn\.pydata\.org/[^\s\)]+",
-            r"https?://plotly\.com/[^\s\)]+",
-            r"https?://bokeh\.org/[^\s\)]+",
-            r"https?://dash\.plotly\.com/[^\s\)]+",
-            r"https?://streamlit\.io/[^\s\)]+",
-            r"https?://gradio\.app/[^\s\)]+",
-            r"https?://panel\.holoviz\.org/[^\s\)]+",
-            r"https?://voila\.readthedocs\.io/[^\s\)]+",
-            r"https?://jupyter\.org/[^\s\)]+",
-            r"https?://colab\.research\.google\.com/[^\s\)]+",
-            r"https?://kaggle\.com/[^\s\)]+",
-            r"https?://wandb\.ai/[^\s\)]+",
-            r"https?://neptune\.ai/[^\s\)]+",
-            r"https?://mlflow\.org/[^\s\)]+",
-            r"https?://dvc\.org/[^\s\)]+",
-            r"https?://weights\.biases\.com/[^\s\)]+",
-            r"https?://tensorboard\.dev/[^\s\)]+",
-            r"https?://tensorboard\.org/[^\s\)]+",
-            r"https?://tensorflow\.org/[^\s\)]+",
-            r"https?://pytorch\.org/[^\s\)]+",
-            r"https?://keras\.io/[^\s\)]+",
-            r"https?://scikit-learn\.org/[^\s\)]+",
-            r"https?://scipy\.org/[^\s\)]+",
-            r"https?://numpy\.org/[^\s\)]+",
-            r"https?://pandas\.pydata\.org/[^\s\)]+",
-            r"https?://matplotlib\.org/[^\s\)]+",
-            r"https?://seaborn\.pydata\.org/[^\s\)]+",
-            r"https?://plotly\.com/[^\s\)]+",
-            r"https?://bokeh\.org/[^\s\)]+",
-            r"https?://dash\.plotly\.com/[^\s\)]+",
-            r"https?://streamlit\.io/[^\s\)]+",
-            r"https?://gradio\.app/[^\s\)]+",
-            r"https?://panel\.holoviz\.org/[^\s\)]+",
-            r"https?://voila\.readthedocs\.io/[^\s\)]+",
-            r"https?://jupyter\.org/[^\s\)]+",
-        ]
-        
         # 遍历每个段落
-        for p in paragraphs:
+        for p in document.paragraphs:
             # 检查官方实现指标
-            for pattern in rules.get("official_patterns", []):
-                matches = re.finditer(pattern, p, re.IGNORECASE)
+            for pattern in rule_set.official_patterns:
+                matches = pattern.finditer(text, p.start, p.end)
                 for match in matches:
                     official_count += 1
-                    evidence = p[max(0, match.start()-50):min(len(p), match.end()+50)].strip()
+                    evidence = text[max(p.start, match.start()-50):min(p.end, match.end()+50)].strip()
                     if evidence not in official_evidence:
                         official_evidence.append(evidence)
             
             # 检查非官方实现指标
-            for pattern in rules.get("unofficial_patterns", []):
-                matches = re.finditer(pattern, p, re.IGNORECASE)
+            for pattern in rule_set.unofficial_patterns:
+                matches = pattern.finditer(text, p.start, p.end)
                 for match in matches:
                     unofficial_count += 1
-                    evidence = p[max(0, match.start()-50):min(len(p), match.end()+50)].strip()
+                    evidence = text[max(p.start, match.start()-50):min(p.end, match.end()+50)].strip()
                     if evidence not in unofficial_evidence:
                         unofficial_evidence.append(evidence)
-            
-            # 查找代码链接
-            for pattern in code_patterns:
-                matches = re.finditer(pattern, p)
-                for match in matches:
-                    code_url = match.group().strip()
-                    if code_url and not result["code_url"]:
-                        result["code_url"] = code_url
+        
+        # 查找代码链接：全文的链接只扫描一次（有区间文件时直接取链接区间），
+        # 按域名在代码托管站点表中查找优先级，取优先级最高、位置最靠前的链接；
+        # 找到最高优先级的链接后，后面的链接不可能更优，直接停止
+        # 查找链接出错时只放弃代码链接，已收集的实现证据仍用于判定
+        best_rank = None
+        top_rank = min(rule_set.code_hosts.values(), default=None)
+        try:
+            for start, end in document.urls():
+                url = text[start:end]
+                rank = rule_set.code_host_rank(url)
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank = rank
+                    result["code_url"] = url
+                    if rank == top_rank:
+                        break
+        except Exception as e:
+            print(f"查找代码链接时出错: {str(e)}")
         
         # 根据计数确定实现类型和置信度
         if official_count > 0 or unofficial_count > 0:
             if official_count > unofficial_count:
                 result["type"] = "official"
-                result["evidence"] = official_evidence[:3]  # 最多保留3条证据
-                result["confidence"] = "high" if official_count >= 3 else "medium"
+                result["evidence"] = official_evidence[:MAX_EVIDENCE]
+                result["confidence"] = "high" if official_count >= HIGH_CONFIDENCE_COUNT else "medium"
             else:
                 result["type"] = "unofficial"
-                result["evidence"] = unofficial_evidence[:3]  # 最多保留3条证据
-                result["confidence"] = "high" if unofficial_count >= 3 else "medium"
+                result["evidence"] = unofficial_evidence[:MAX_EVIDENCE]
+                result["confidence"] = "high" if unofficial_count >= HIGH_CONFIDENCE_COUNT else "medium"
         
         # 如果有代码链接但没有其他证据，设置为中等置信度的非官方实现
         elif result["code_url"]:
@@ -440,67 +300,74 @@ def analyze_code_implementation(text, rules_file):
         
     return result
 
-def analyze_method_innovation(text, rules_file):
+def analyze_method_innovation(text, rules, short_circuit=False):
     """分析论文中的方法创新点。
     
+    报告只保留按文档顺序最先出现的几个创新方法和改进点，短路模式下某一类收满后
+    不再扫描该类关键字，两类都收满后停止，报告字段与完整扫描相同；
+    keyword_hits 只统计已扫描的部分，结果中记录 short_circuit 标记。
+    
     Args:
-        text (str): 预处理后的论文文本
-        rules_file (str): 分析规则文件路径
+        text (Document | str): 已解析的文档或预处理后的论文文本
+        rules (CompiledRuleSet | str): 已编译的规则或分析规则文件路径
+        short_circuit (bool): 是否在结果收满后提前停止扫描
     
     Returns:
         dict: 包含创新方法和改进点的字典，如果分析失败则返回 None
     """
     try:
-        # 加载分析规则
-        rules = load_rules(rules_file)
-        if not rules or 'method_innovation' not in rules:
+        # 获取已编译的分析规则
+        rule_set = resolve_rule_set(rules)
+        if not rule_set.has_innovation_rules:
             print("未找到方法创新分析规则")
             return None
             
         # 初始化结果字典
         result = {
             'novel_methods': [],  # 创新方法列表
-            'improvements': []    # 改进点列表
+            'improvements': [],   # 改进点列表
+            'keyword_hits': {'novel': {}, 'improvement': {}}  # 各关键字的命中次数
         }
         
-        # 将文本分割成段落
-        paragraphs = text.split("\n\n")
+        categories = [
+            ('novel_methods', 'novel', rule_set.novel_matcher),
+            ('improvements', 'improvement', rule_set.improvement_matcher)
+        ]
+        
+        if short_circuit:
+            result['short_circuit'] = True
+        
+        # 段落和句子边界取自共享的文档结构
+        document = as_document(text)
+        text = document.text
         
-        # 分析每个段落
-        for paragraph in paragraphs:
+        # 分析每个段落：每类关键字只扫描段落一次
+        for paragraph in document.paragraphs:
+            # 短路模式：两类结果都已收满
+            if short_circuit and not categories:
+                break
             # 跳过空段落
-            if not paragraph.strip():
+            if document.is_blank(paragraph):
                 continue
-                
-            # 查找创新方法
-            for pattern in rules['method_innovation']['novel_patterns']:
-                matches = re.finditer(pattern, paragraph, re.IGNORECASE)
-                for match in matches:
-                    # 提取包含匹配的完整句子
-                    sentences = re.split('[.!?]', paragraph)
-                    for sentence in sentences:
-                        if match.group() in sentence:
-                            # 清理并添加句子
-                            cleaned = sentence.strip()
-                            if cleaned and cleaned not in result['novel_methods']:
-                                result['novel_methods'].append(cleaned)
-                                
-            # 查找改进点
-            for pattern in rules['method_innovation']['improvement_patterns']:
-                matches = re.finditer(pattern, paragraph, re.IGNORECASE)
-                for match in matches:
-                    # 提取包含匹配的完整句子
-                    sentences = re.split('[.!?]', paragraph)
-                    for sentence in sentences:
-                        if match.group() in sentence:
-                            # 清理并添加句子
-                            cleaned = sentence.strip()
-                            if cleaned and cleaned not in result['improvements']:
-                                result['improvements'].append(cleaned)
+            
+            for result_key, hit_key, matcher in list(categories):
+                # 短路模式：该类结果已收满，后续段落不再扫描该类关键字
+                if short_circuit and len(result[result_key]) >= MAX_INNOVATION_ITEMS:
+                    categories.remove((result_key, hit_key, matcher))
+                    continue
+                hits = result['keyword_hits'][hit_key]
+                for keyword, match in matcher.finditer(text, paragraph.start, paragraph.end):
+                    hits[keyword] = hits.get(keyword, 0) + 1
+                    # 按匹配位置在句子边界索引中二分查找所在的完整句子
+                    sentence = document.sentence_at(paragraph, match.start())
+                    # 清理并添加句子
+                    cleaned = document.slice(sentence).strip()
+                    if cleaned and cleaned not in result[result_key]:
+                        result[result_key].append(cleaned)
         
         # 限制结果数量
-        result['novel_methods'] = result['novel_methods'][:3]  # 最多保留3个创新方法
-        result['improvements'] = result['improvements'][:3]    # 最多保留3个改进点
+        result['novel_methods'] = result['novel_methods'][:MAX_INNOVATION_ITEMS]
+        result['improvements'] = result['improvements'][:MAX_INNOVATION_ITEMS]
         
         return result
         
@@ -508,72 +375,124 @@ def analyze_method_innovation(text, rules_file):
         print(f"分析创新点时出错: {str(e)}")
         return None
 
-def analyze_paper(text_file, rules_file, output_dir):
+def _run_paper_info(document, rule_set, short_circuit):
+    """分析项：论文基本信息"""
+    return extract_paper_info(document) or {
+        'title': None,
+        'authors': [],
+        'institutions': []
+    }
+
+def _run_implementation(document, rule_set, short_circuit):
+    """分析项：代码实现"""
+    return analyze_code_implementation(document, rule_set) or {
+        'type': 'unknown',
+        'confidence': 'unknown',
+        'code_url': None,
+        'evidence': []
+    }
+
+def _run_innovation(document, rule_set, short_circuit):
+    """分析项：方法创新"""
+    return analyze_method_innovation(document, rule_set, short_circuit=short_circuit) or {
+        'novel_methods': [],
+        'improvements': []
+    }
+
+# 分析项注册表：结果字段名 -> 分析函数 (document, rule_set, short_circuit) -> 结果
+ANALYZERS = {
+    'paper_info': _run_paper_info,
+    'implementation': _run_implementation,
+    'innovation': _run_innovation,
+}
+
+# 默认运行全部分析项
+DEFAULT_ANALYZERS = tuple(ANALYZERS)
+
+def select_analyzers(names=None):
+    """校验要运行的分析项，None 表示全部分析项"""
+    if names is None:
+        return DEFAULT_ANALYZERS
+    unknown = [name for name in names if name not in ANALYZERS]
+    if unknown:
+        raise ValueError(f"未知的分析项：{', '.join(unknown)}，可选值：{', '.join(ANALYZERS)}")
+    return tuple(names)
+
+class AnalysisResults(dict):
+    """论文分析结果
+    
+    只包含已运行的分析项；访问未运行的分析项（results['innovation']）时，
+    重新读取预处理文本，按同一份规则计算并保存到结果中。
+    in 判断和 get() 不会触发计算，保存的 JSON 也只包含已运行的分析项。
+    """
+    
+    def __init__(self, text_file, rule_set, short_circuit=False):
+        super().__init__()
+        self.text_file = text_file
+        self.rule_set = rule_set
+        self.short_circuit = short_circuit
+    
+    def run(self, name, document):
+        """用已解析的文档运行一个分析项并保存结果"""
+        self[name] = ANALYZERS[name](document, self.rule_set, self.short_circuit)
+        return self[name]
+    
+    def __missing__(self, name):
+        if name not in ANALYZERS:
+            raise KeyError(name)
+        return self.run(name, Document.load(self.text_file))
+
+def analyze_paper(text_file, rules_file, output_dir, rule_set=None, short_circuit=False,
+                  analyzers=None, write_report=True):
     """分析论文内容，提取关键信息并生成报告。
     
     Args:
         text_file (str): 预处理后的论文文本文件路径
-        rules_file (str): 分析规则文件路径
+        rules_file (str): 分析规则文件路径，提供 rule_set 时可以为 None
         output_dir (str): 输出目录路径
+        rule_set (CompiledRuleSet): 已编译的共享规则，提供时不再读取规则文件
+        short_circuit (bool): 短路模式，方法创新结果收满后提前停止扫描（见 analyze_method_innovation）
+        analyzers (list): 要运行的分析项（ANALYZERS 中的名称），None 表示全部；
+            未运行的分析项在之后访问时才计算
+        write_report (bool): 是否生成 Markdown 分析报告，报告只包含已运行的分析项
     
     Returns:
-        dict: 包含所有分析结果的字典，如果分析失败则返回 None
+        AnalysisResults: 包含分析结果的字典，如果分析失败则返回 None
     """
     try:
+        analyzers = select_analyzers(analyzers)
+        
         # 创建输出目录
         os.makedirs(output_dir, exist_ok=True)
         
-        # 读取文本内容
-        with open(text_file, 'r', encoding='utf-8') as f:
-            text = f.read()
-            
-        # 提取论文基本信息
-        paper_info = extract_paper_info(text)
-        if not paper_info:
-            paper_info = {
-                'title': None,
-                'authors': [],
-                'institutions': []
-            }
-            
-        # 分析代码实现
-        implementation = analyze_code_implementation(text, rules_file)
-        if not implementation:
-            implementation = {
-                'type': 'unknown',
-                'confidence': 'unknown',
-                'code_url': None,
-                'evidence': []
-            }
-            
-        # 分析方法创新
-        innovation = analyze_method_innovation(text, rules_file)
-        if not innovation:
-            innovation = {
-                'novel_methods': [],
-                'improvements': []
-            }
-            
-        # 组合结果
-        results = {
-            'paper_info': paper_info,
-            'implementation': implementation,
-            'innovation': innovation,
-            'analysis_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        # 读取文本内容，支持普通文本和压缩文本产物；预处理区间文件存在时一并读取。
+        # 段落、句子和页面边界只解析一次，所有分析器共用
+        document = Document.load(text_file)
+        
+        # 规则只编译一次，各分析项共用
+        rule_set = rule_set or resolve_rule_set(rules_file)
+        
+        # 只运行选中的分析项
+        results = AnalysisResults(text_file, rule_set, short_circuit)
+        for name in analyzers:
+            results.run(name, document)
+        results['rules'] = rule_set.stamp
+        results['analysis_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # 保存分析结果
         results_file = os.path.join(output_dir, 'analysis_results.json')
         with open(results_file, 'w', encoding='utf-8') as f:
             json.dump(results, f, ensure_ascii=False, indent=2)
-            
-        # 生成分析报告
-        report_file = os.path.join(output_dir, 'analysis_report.md')
-        generate_report(results, report_file)
         
         print(f"\n分析完成！")
+        print(f"分析项：{', '.join(analyzers)}")
         print(f"结果文件：{results_file}")
-        print(f"报告文件：{report_file}")
+        
+        # 生成分析报告
+        if write_report:
+            report_file = os.path.join(output_dir, 'analysis_report.md')
+            generate_report(results, report_file)
+            print(f"报告文件：{report_file}")
         
         return results
         
@@ -604,67 +523,78 @@ def generate_report(results, output_file):
             'unknown': '未知'
         }
         
-        # 生成报告内容
+        # 生成报告内容：只包含已运行的分析项（in 判断不会触发未运行分析项的计算）
         report = [
             '# 论文分析报告\n',
-            f'生成时间：{results["analysis_time"]}\n',
-            
-            '## 基本信息',
-            f'- 标题：{results["paper_info"]["title"] or "未提供"}',
-            f'- 作者：{", ".join(results["paper_info"]["authors"]) or "未提供"}',
-            f'- 机构：{", ".join(results["paper_info"]["institutions"]) or "未提供"}\n',
-            
-            '## 代码实现分析',
-            f'- 实现类型：{impl_type_map.get(results["implementation"]["type"], "未知")}',
-            f'- 置信度：{confidence_map.get(results["implementation"]["confidence"], "未知")}'
+            f'生成时间：{results["analysis_time"]}\n'
         ]
         
-        # 添加代码链接（如果有）
-        if results['implementation']['code_url']:
-            report.append(f'- 代码链接：{results["implementation"]["code_url"]}')
+        if 'paper_info' in results:
+            report.extend([
+                '## 基本信息',
+                f'- 标题：{results["paper_info"]["title"] or "未提供"}',
+                f'- 作者：{", ".join(results["paper_info"]["authors"]) or "未提供"}',
+                f'- 机构：{", ".join(results["paper_info"]["institutions"]) or "未提供"}\n'
+            ])
+        
+        if 'implementation' in results:
+            report.extend([
+                '## 代码实现分析',
+                f'- 实现类型：{impl_type_map.get(results["implementation"]["type"], "未知")}',
+                f'- 置信度：{confidence_map.get(results["implementation"]["confidence"], "未知")}'
+            ])
             
-        # 添加支持证据
-        if results['implementation']['evidence']:
-            report.append('\n### 支持证据')
-            for evidence in results['implementation']['evidence']:
-                report.append(f'- {evidence}')
+            # 添加代码链接（如果有）
+            if results['implementation']['code_url']:
+                report.append(f'- 代码链接：{results["implementation"]["code_url"]}')
+                
+            # 添加支持证据
+            if results['implementation']['evidence']:
+                report.append('\n### 支持证据')
+                for evidence in results['implementation']['evidence']:
+                    report.append(f'- {evidence}')
                 
         # 添加方法创新分析
-        report.extend([
-            '\n## 方法创新分析',
-            '\n### 创新方法'
-        ])
-        
-        if results['innovation']['novel_methods']:
-            for method in results['innovation']['novel_methods']:
-                report.append(f'- {method}')
-        else:
-            report.append('- 未发现明显的创新方法')
+        if 'innovation' in results:
+            report.extend([
+                '\n## 方法创新分析',
+                '\n### 创新方法'
+            ])
             
-        report.append('\n### 改进点')
-        if results['innovation']['improvements']:
-            for improvement in results['innovation']['improvements']:
-                report.append(f'- {improvement}')
-        else:
-            report.append('- 未发现明显的改进点')
+            if results['innovation']['novel_methods']:
+                for method in results['innovation']['novel_methods']:
+                    report.append(f'- {method}')
+            else:
+                report.append('- 未发现明显的创新方法')
+                
+            report.append('\n### 改进点')
+            if results['innovation']['improvements']:
+                for improvement in results['innovation']['improvements']:
+                    report.append(f'- {improvement}')
+            else:
+                report.append('- 未发现明显的改进点')
             
         # 添加总结
-        report.extend([
-            '\n## 分析总结',
-            '### 代码实现情况',
-            f'该论文{impl_type_map.get(results["implementation"]["type"], "未知")}，'
-            f'置信度{confidence_map.get(results["implementation"]["confidence"], "未知")}。'
-        ])
-        
-        if results['implementation']['code_url']:
-            report.append(f'提供了代码链接：{results["implementation"]["code_url"]}')
+        if 'implementation' in results or 'innovation' in results:
+            report.append('\n## 分析总结')
+        
+        if 'implementation' in results:
+            report.extend([
+                '### 代码实现情况',
+                f'该论文{impl_type_map.get(results["implementation"]["type"], "未知")}，'
+                f'置信度{confidence_map.get(results["implementation"]["confidence"], "未知")}。'
+            ])
             
-        report.append('\n### 创新性分析')
-        if results['innovation']['novel_methods'] or results['innovation']['improvements']:
-            report.append(f'论文提出了 {len(results["innovation"]["novel_methods"])} 个创新方法'
-                        f'和 {len(results["innovation"]["improvements"])} 个改进点。')
-        else:
-            report.append('未发现明显的创新方法或改进点。')
+            if results['implementation']['code_url']:
+                report.append(f'提供了代码链接：{results["implementation"]["code_url"]}')
+            
+        if 'innovation' in results:
+            report.append('\n### 创新性分析')
+            if results['innovation']['novel_methods'] or results['innovation']['improvements']:
+                report.append(f'论文提出了 {len(results["innovation"]["novel_methods"])} 个创新方法'
+                            f'和 {len(results["innovation"]["improvements"])} 个改进点。')
+            else:
+                report.append('未发现明显的创新方法或改进点。')
             
         # 保存报告
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -0,0 +1,179 @@
+import os
+import re
+import json
+from hashlib import blake2b
+from collections import Counter
+from pathlib import Path
+from threading import Lock
+
+DEDUP_INDEX_FILE = "output/cache/minhash_index.json"
+
+# 签名算法标识，保存的签名与当前算法不一致时丢弃
+SIGNATURE_SCHEME = "oph-blake2b-v2"
+# 参与去重所需的最少 shingle 数。正文太少（如只提取到版权页脚的扫描件）的论文不参与去重，照常分析
+MIN_SHINGLES = 50
+_MASK64 = (1 << 64) - 1
+_PAGE_MARKER = re.compile(r'^=== 第 \d+ 页 ===$', re.MULTILINE)
+_WORD = re.compile(r'\w+')
+
+class MinHasher:
+    """基于词级 shingle 的 MinHash 签名生成器（单置换哈希，one permutation hashing）
+
+    每个 shingle 只计算一次 64 位哈希：低位决定落入 num_perm 个分桶中的哪一个，
+    高位作为桶内取值，每个桶保留最小值；空桶向后借用最近的非空桶（加上偏移）补齐。
+    签名长度与按位置比较的方式与经典 MinHash 相同，可直接用于 LSH 分段，
+    但开销只有每个 shingle 一次哈希，与 num_perm 无关。
+    """
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1, min_shingles=MIN_SHINGLES):
+        """相同参数生成的签名可以跨进程、跨运行比较"""
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_shingles = max(1, min_shingles)
+        self.key = seed.to_bytes(8, "little")
+
+    def _page_shingles(self, page):
+        """单页文本按连续 shingle_size 个词生成的 shingle 哈希集合"""
+        words = _WORD.findall(page.lower())
+        size = self.shingle_size
+        key = self.key
+        return {int.from_bytes(blake2b(" ".join(words[i:i + size]).encode("utf-8"),
+                                       digest_size=8, key=key).digest(), "little")
+                for i in range(len(words) - size + 1)}
+
+    def shingles(self, text):
+        """按页面标记分页生成 shingle 哈希集合，去掉超过半数页面都出现的页眉页脚类 shingle
+
+        版权声明、下载水印等每页重复的内容在不同论文之间相同，保留它们会让正文很少的论文被误判为重复。
+        """
+        pages = [self._page_shingles(page) for page in _PAGE_MARKER.split(text)]
+        pages = [page for page in pages if page]
+        if len(pages) < 2:
+            return pages[0] if pages else set()
+        counts = Counter(h for page in pages for h in page)
+        limit = len(pages) // 2
+        return {h for h, count in counts.items() if count <= limit}
+
+    def signature(self, text):
+        """计算文本的 MinHash 签名，去掉页眉页脚后 shingle 少于 min_shingles 个时返回 None（不参与去重）"""
+        hashes = self.shingles(text)
+        if len(hashes) < self.min_shingles:
+            return None
+        num_perm = self.num_perm
+        bins = [None] * num_perm
+        for h in hashes:
+            index, value = h % num_perm, h // num_perm
+            if bins[index] is None or value < bins[index]:
+                bins[index] = value
+        # 空桶补齐：取后面第一个非空桶的值，加上与距离相关的偏移，避免不同文档的空桶偶然相等
+        signature = []
+        for index in range(num_perm):
+            step = 0
+            while bins[(index + step) % num_perm] is None:
+                step += 1
+            signature.append((bins[(index + step) % num_perm] + step * 0x9E3779B97F4A7C15) & _MASK64)
+        return signature
+
+def estimate_similarity(signature1, signature2):
+    """用签名中相同位置取值相等的比例估计 Jaccard 相似度"""
+    same = sum(1 for x, y in zip(signature1, signature2) if x == y)
+    return same / len(signature1)
+
+class DuplicateIndex:
+    """MinHash 签名的 LSH 索引，用于在接近线性的时间内查找近重复论文。
+
+    签名被切分为 bands 段，任意一段完全相同的论文成为候选，
+    再用签名估计的相似度确认。签名按论文ID持久化保存，供后续运行复用。
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=16, store_file=DEDUP_INDEX_FILE,
+                 min_shingles=MIN_SHINGLES):
+        """加载已保存的签名，LSH 分桶只包含本次运行中登记的论文"""
+        if num_perm % bands:
+            raise ValueError(f"签名长度 {num_perm} 不能被分段数 {bands} 整除")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, min_shingles=min_shingles)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.store_file = Path(store_file)
+        self.signatures = {}
+        self._saved = {}
+        self._buckets = {}
+        self._lock = Lock()
+        if self.store_file.exists():
+            try:
+                with open(self.store_file, "r", encoding="utf-8") as f:
+                    saved = json.load(f)
+                if saved.get("num_perm") == num_perm and saved.get("scheme") == SIGNATURE_SCHEME:
+                    self._saved = saved.get("signatures", {})
+            except (OSError, ValueError) as e:
+                print(f"读取近重复索引时出错：{str(e)}")
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(band, tuple(signature[band * rows:(band + 1) * rows]))
+                for band in range(self.bands)]
+
+    def _query(self, signature):
+        """返回相似度最高且达到阈值的已登记论文 (论文ID, 相似度)，没有时返回 None"""
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        best = None
+        for paper_id in candidates:
+            similarity = estimate_similarity(signature, self.signatures[paper_id])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (paper_id, similarity)
+        return best
+
+    def _add(self, paper_id, signature):
+        self.signatures[paper_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(paper_id)
+
+    def claim(self, paper_id, text):
+        """登记论文文本；已有近重复论文时返回 (原论文ID, 相似度) 且不登记，否则返回 None
+
+        正文过少无法生成签名的论文既不登记也不匹配，返回 None，照常分析。
+        """
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        with self._lock:
+            match = self._query(signature)
+            if match is None:
+                self._add(paper_id, signature)
+            return match
+
+    def restore(self, paper_id):
+        """将上次运行保存的论文签名重新登记到索引中（用于沿用上次结果的论文）"""
+        with self._lock:
+            signature = self._saved.get(paper_id)
+            if signature is not None and paper_id not in self.signatures:
+                self._add(paper_id, signature)
+
+    def discard(self, paper_id):
+        """从索引中移除论文（如处理失败），之后的重复论文不再链接到它"""
+        with self._lock:
+            signature = self.signatures.pop(paper_id, None)
+            self._saved.pop(paper_id, None)
+            if signature is not None:
+                for key in self._band_keys(signature):
+                    bucket = self._buckets.get(key, [])
+                    if paper_id in bucket:
+                        bucket.remove(paper_id)
+
+    def save(self):
+        """保存签名，先写临时文件再原子替换"""
+        self.store_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.store_file.with_name(self.store_file.name + f".{os.getpid()}.tmp")
+        with self._lock:
+            data = {
+                "num_perm": self.hasher.num_perm,
+                "scheme": SIGNATURE_SCHEME,
+                "signatures": dict(self._saved, **self.signatures)
+            }
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        os.replace(tmp_file, self.store_file)
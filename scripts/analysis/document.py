@@ -0,0 +1,137 @@
+import os
+import re
+from bisect import bisect_right
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.preprocessing.page_store import read_text_artifact
+from scripts.preprocessing.preprocess_text import find_urls, load_spans
+
+_PAGE_MARKER = re.compile(r'^=== 第 (\d+) 页 ===$', re.MULTILINE)
+_SENTENCE_END = re.compile(r'[.!?]')
+_NON_SPACE = re.compile(r'\S')
+
+class Paragraph:
+    """段落在文档文本中的区间 [start, end)，句子边界及其起点索引在首次使用时计算"""
+    __slots__ = ("start", "end", "sentences", "sentence_starts")
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.sentences = None
+        self.sentence_starts = None
+
+class Sentence:
+    """句子在文档文本中的区间 [start, end)"""
+    __slots__ = ("start", "end")
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+class Page:
+    """页面在文档文本中的区间 [start, end)，从页面标记开始"""
+    __slots__ = ("number", "start", "end")
+
+    def __init__(self, number, start, end):
+        self.number = number
+        self.start = start
+        self.end = end
+
+class Document:
+    """每篇论文只解析一次的文档结构，供所有分析器共用
+
+    段落、句子和页面只记录在同一个文本缓冲区中的偏移，不复制子串；
+    分析器用 pattern.finditer(document.text, start, end) 直接在缓冲区上匹配。
+    段落按 "\\n\\n" 切分，与 text.split("\\n\\n") 的结果一一对应。
+    """
+    __slots__ = ("text", "spans", "paragraphs", "_pages")
+
+    def __init__(self, text, spans=None):
+        """切分段落边界，页面边界在首次访问时计算"""
+        self.text = text
+        self.spans = spans
+        self._pages = None
+
+        paragraphs = []
+        start = 0
+        while True:
+            end = text.find("\n\n", start)
+            if end < 0:
+                paragraphs.append(Paragraph(start, len(text)))
+                break
+            paragraphs.append(Paragraph(start, end))
+            start = end + 2
+        self.paragraphs = paragraphs
+
+    @property
+    def pages(self):
+        """文档中的页面，优先取自预处理区间文件，没有区间文件时扫描页面标记"""
+        if self._pages is None:
+            text = self.text
+            if self.spans is not None and "page" in self.spans:
+                self._pages = [Page(number, start, end) for number, start, end in self.spans["page"]]
+            else:
+                markers = list(_PAGE_MARKER.finditer(text))
+                self._pages = [
+                    Page(int(marker.group(1)), marker.start(),
+                         markers[i + 1].start() - 1 if i + 1 < len(markers) else len(text))
+                    for i, marker in enumerate(markers)
+                ]
+        return self._pages
+
+    @classmethod
+    def load(cls, text_file):
+        """读取预处理文本（普通文本或压缩文本产物）及其区间文件，区间文件与文本不一致时忽略区间文件"""
+        text = read_text_artifact(text_file)
+        return cls(text, load_spans(text_file, len(text)))
+
+    def slice(self, record):
+        """取出段落、句子或页面的文本"""
+        return self.text[record.start:record.end]
+
+    def is_blank(self, record):
+        """区间内是否只有空白字符"""
+        return _NON_SPACE.search(self.text, record.start, record.end) is None
+
+    def leading_paragraphs(self, count):
+        """文档开头的前 count 个非空段落（去掉首尾空白），用于提取标题、作者和机构"""
+        result = []
+        for paragraph in self.paragraphs:
+            if len(result) >= count:
+                break
+            content = self.slice(paragraph).strip()
+            if content:
+                result.append(content)
+        return result
+
+    def urls(self):
+        """文档中所有链接的 (起点, 终点)，按位置排序；有预处理区间时直接取链接区间，否则扫描全文一次"""
+        if self.spans is not None and "url" in self.spans:
+            return [(start, end) for start, end in self.spans["url"]]
+        return list(find_urls(self.text))
+
+    def sentences(self, paragraph):
+        """段落中的句子，按 [.!?] 切分，与 re.split('[.!?]', 段落文本) 的结果一一对应"""
+        if paragraph.sentences is None:
+            sentences = []
+            start = paragraph.start
+            for match in _SENTENCE_END.finditer(self.text, paragraph.start, paragraph.end):
+                sentences.append(Sentence(start, match.start()))
+                start = match.end()
+            sentences.append(Sentence(start, paragraph.end))
+            paragraph.sentences = sentences
+            paragraph.sentence_starts = [sentence.start for sentence in sentences]
+        return paragraph.sentences
+
+    def sentence_at(self, paragraph, offset):
+        """段落中包含偏移 offset 的句子，在句子起点索引上二分查找，O(log n)"""
+        sentences = self.sentences(paragraph)
+        return sentences[bisect_right(paragraph.sentence_starts, offset) - 1]
+
+def as_document(text, spans=None):
+    """接受已解析的文档或文本字符串，返回文档"""
+    if isinstance(text, Document):
+        return text
+    return Document(text, spans)
@@ -0,0 +1,238 @@
+import os
+import re
+import json
+import yaml
+import hashlib
+from pathlib import Path
+from urllib.parse import urlsplit
+from threading import Lock
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+# 默认规则配置文件，是默认分析规则的唯一来源，按项目根目录定位，与当前工作目录无关
+DEFAULT_PROFILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                               "config", "rules", "default.yaml")
+
+# 规则配置的结构：各部分及其包含的模式列表
+RULE_SCHEMA = {
+    "code_implementation": ("official_patterns", "unofficial_patterns", "code_indicators"),
+    "method_innovation": ("novel_patterns", "improvement_patterns"),
+}
+
+# 合并为一个交替正则（KeywordMatcher）扫描的模式列表，除单个模式外还需校验合并后的正则
+KEYWORD_FIELDS = {
+    "method_innovation": ("novel_patterns", "improvement_patterns"),
+}
+
+# 各部分中可选的映射字段，缺省时使用默认规则配置中的值
+RULE_MAPPINGS = {
+    "code_implementation": ("code_hosts",),
+}
+
+def _load_rules_file(rules_file):
+    """读取规则文件，支持 YAML 规则配置和 JSON 规则文件"""
+    with open(rules_file, "r", encoding="utf-8") as f:
+        if Path(rules_file).suffix in (".yaml", ".yml"):
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def with_defaults(rules):
+    """补全规则中缺省的可选映射字段，返回实际生效的规则（不修改传入的规则）"""
+    missing = [(section, field) for section, fields in RULE_MAPPINGS.items()
+               for field in fields if field not in rules[section]]
+    if not missing:
+        return rules
+    defaults = _load_rules_file(DEFAULT_PROFILE)
+    rules = dict(rules)
+    for section, field in missing:
+        rules[section] = dict(rules[section], **{field: defaults[section][field]})
+    return rules
+
+def _validate_code_hosts(hosts):
+    """校验代码托管站点表：域名 -> 正整数优先级"""
+    if not isinstance(hosts, dict):
+        return ["code_implementation.code_hosts 必须是 域名: 优先级 的映射"]
+    errors = []
+    for host, rank in hosts.items():
+        if not isinstance(host, str) or not host or "/" in host:
+            errors.append(f"code_implementation.code_hosts 中的域名无效：{host!r}")
+        if isinstance(rank, bool) or not isinstance(rank, int) or rank < 1:
+            errors.append(f"code_implementation.code_hosts 中 {host} 的优先级必须是正整数：{rank!r}")
+    return errors
+
+def validate_rules(rules):
+    """校验规则结构和正则表达式，返回错误信息列表（为空表示校验通过）"""
+    if not isinstance(rules, dict):
+        return ["规则配置必须是字典"]
+
+    errors = []
+    if not isinstance(rules.get("version"), (str, int, float)):
+        errors.append("缺少规则版本 version")
+    for key in rules:
+        if key != "version" and key not in RULE_SCHEMA:
+            errors.append(f"未知的规则部分：{key}")
+
+    for section, fields in RULE_SCHEMA.items():
+        content = rules.get(section)
+        if not isinstance(content, dict):
+            errors.append(f"缺少规则部分：{section}")
+            continue
+        for key in content:
+            if key not in fields and key not in RULE_MAPPINGS.get(section, ()):
+                errors.append(f"{section} 中未知的字段：{key}")
+        for field in fields:
+            patterns = content.get(field)
+            if not isinstance(patterns, list):
+                errors.append(f"{section}.{field} 必须是模式列表")
+                continue
+            field_errors = len(errors)
+            for pattern in patterns:
+                if not isinstance(pattern, str) or not pattern:
+                    errors.append(f"{section}.{field} 中存在空模式或非字符串模式：{pattern!r}")
+                    continue
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    errors.append(f"{section}.{field} 中的模式 {pattern!r} 无效：{e}")
+            # 单个模式都有效时，合并后的交替正则仍可能无效（如全局标志不在开头、与自动生成的命名分组重名）
+            if len(errors) == field_errors and field in KEYWORD_FIELDS.get(section, ()):
+                try:
+                    KeywordMatcher(patterns)
+                except re.error as e:
+                    errors.append(f"{section}.{field} 合并后的关键字正则无效：{e}")
+
+    code = rules.get("code_implementation")
+    if isinstance(code, dict) and "code_hosts" in code:
+        errors.extend(_validate_code_hosts(code["code_hosts"]))
+    return errors
+
+class KeywordMatcher:
+    """将多个关键字模式编译为一个交替正则，一次扫描找出所有关键字命中
+
+    每个模式对应一个命名分组，按长度从长到短排列，使 "proposed" 优先于 "propose"；
+    模式左侧加单词边界，避免 "new" 命中 "renewal" 这类词中片段。
+    """
+
+    def __init__(self, patterns):
+        """编译关键字模式"""
+        self.patterns = tuple(patterns)
+        ordered = sorted(enumerate(self.patterns), key=lambda item: -len(item[1]))
+        self._keywords = {f"k{i}": pattern for i, pattern in ordered}
+        alternation = "|".join(f"(?P<k{i}>{pattern})" for i, pattern in ordered)
+        self._regex = re.compile(rf"\b(?:{alternation})", re.IGNORECASE) if self.patterns else None
+
+    def finditer(self, text, pos=0, endpos=None):
+        """逐个产出 (命中的关键字模式, 匹配对象)，按在文本中的位置排序，可限定扫描区间 [pos, endpos)"""
+        if self._regex is None:
+            return
+        if endpos is None:
+            endpos = len(text)
+        for match in self._regex.finditer(text, pos, endpos):
+            yield self._keywords[match.lastgroup], match
+
+class CompiledRuleSet:
+    """预编译的分析规则，构建后只读，可在多个工作线程之间共享"""
+
+    def __init__(self, rules):
+        """校验并编译规则中的所有正则表达式，校验失败时抛出 ValueError"""
+        errors = validate_rules(rules)
+        if errors:
+            raise ValueError("规则校验失败：\n" + "\n".join(f"- {error}" for error in errors))
+        # 哈希和分析都基于补全缺省字段后实际生效的规则
+        rules = with_defaults(rules)
+        self.rules = rules
+        self.version = str(rules.get("version", "unversioned"))
+        # 规则内容的稳定哈希：键排序后的紧凑 JSON，与文件格式和键顺序无关
+        canonical = json.dumps(rules, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        self.content_hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+        code = rules.get("code_implementation", {})
+        innovation = rules.get("method_innovation", {})
+
+        self.official_patterns = self._compile(code.get("official_patterns", []))
+        self.unofficial_patterns = self._compile(code.get("unofficial_patterns", []))
+        self.code_hosts = {host.lower(): rank for host, rank in code["code_hosts"].items()}
+        self.novel_matcher = KeywordMatcher(innovation.get("novel_patterns", []))
+        self.improvement_matcher = KeywordMatcher(innovation.get("improvement_patterns", []))
+
+    @staticmethod
+    def _compile(patterns):
+        return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+
+    def code_host_rank(self, url):
+        """代码链接的优先级（数字越小越优先），不是代码托管站点或没有路径时返回 None
+
+        域名去掉 www. 后在代码托管站点表中查找，找不到时依次查找上级域名。
+        """
+        try:
+            # 正文中的链接可能带有引用标记等残余字符（如 www.physionet.org[12]），无法解析时视为非代码链接
+            parts = urlsplit(url if "://" in url else "http://" + url)
+            hostname = parts.hostname
+        except ValueError:
+            return None
+        if parts.path in ("", "/") and not parts.query:
+            return None
+        host = (hostname or "").removeprefix("www.")
+        labels = host.split(".")
+        for i in range(len(labels) - 1):
+            rank = self.code_hosts.get(".".join(labels[i:]))
+            if rank is not None:
+                return rank
+        return None
+
+    @property
+    def stamp(self):
+        """写入分析结果的规则标识"""
+        return {"version": self.version, "hash": self.content_hash}
+
+    def is_current(self, results):
+        """分析结果是否由当前规则产生（没有规则标识的旧结果视为过期）"""
+        stamp = (results or {}).get("rules") or {}
+        return stamp.get("hash") == self.content_hash
+
+    @property
+    def has_innovation_rules(self):
+        """规则中是否包含方法创新分析部分"""
+        return "method_innovation" in self.rules
+
+    @classmethod
+    def from_file(cls, rules_file):
+        """从规则文件构建，支持 YAML 规则配置和 JSON 规则文件"""
+        return cls(_load_rules_file(rules_file))
+
+_rule_sets = {}
+_rule_sets_lock = Lock()
+
+def get_rule_set(rules_file=None):
+    """获取进程内共享的已编译规则
+
+    规则文件修改后，下一次调用时重新加载、校验并编译，随后整体替换旧规则；
+    已经拿到旧规则的调用方不受影响。新规则校验失败时打印错误并继续使用上一版本。
+
+    Args:
+        rules_file (str): 规则文件路径（YAML 或 JSON），为 None 时使用默认规则配置
+
+    Returns:
+        CompiledRuleSet: 已编译的规则
+    """
+    if rules_file is None:
+        rules_file = DEFAULT_PROFILE
+    path = os.path.abspath(rules_file)
+
+    with _rule_sets_lock:
+        cached = _rule_sets.get(path)
+        try:
+            # 编辑器保存时规则文件可能短暂不存在，stat 失败与校验失败一样继续使用上一版本
+            mtime = os.stat(path).st_mtime_ns
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            rule_set = CompiledRuleSet.from_file(path)
+        except Exception as e:
+            if cached is None:
+                raise
+            print(f"规则文件 {rules_file} 加载失败，继续使用上一版本规则：{str(e)}")
+            return cached[1]
+        if cached is not None:
+            print(f"规则文件已更新：{rules_file}（版本 {rule_set.version}，哈希 {rule_set.content_hash}）")
+        _rule_sets[path] = (mtime, rule_set)
+        return rule_set
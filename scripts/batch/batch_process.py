@@ -11,12 +11,18 @@ import urllib.parse
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from scripts.preprocessing.validate_pdf import validate_pdf
+from scripts.preprocessing.validate_pdf import open_validated_pdf, validate_pdfs
+from scripts.preprocessing.directory_index import get_directory_index
 from scripts.preprocessing.extract_text import extract_text
+from scripts.preprocessing.extraction_cache import ExtractionCache, DEFAULT_CACHE_DIR
 from scripts.preprocessing.preprocess_text import preprocess_text
-from scripts.analysis.prepare_analysis_rules import prepare_analysis_rules
-from scripts.analysis.analyze_paper import analyze_paper
+from scripts.analysis.rule_set import get_rule_set
+from scripts.analysis.analyze_paper import analyze_paper, select_analyzers
+from scripts.analysis.dedup import DuplicateIndex, DEDUP_INDEX_FILE, MIN_SHINGLES
+from scripts.preprocessing.page_store import read_text_artifact
 from scripts.utils.cleanup import cleanup_temp_files
+from scripts.batch.workspace import PaperWorkspace, make_paper_id, WORKSPACE_ROOT
+from scripts.batch.fingerprints import FingerprintStore, FINGERPRINT_FILE
 
 class BatchProcessor:
     def __init__(self, config_file="config/batch_config.yaml", path_config_file="config/path_config.yaml"):
@@ -29,23 +35,133 @@ class BatchProcessor:
         self.workers = []
         self.task_counter = 0
         self.task_counter_lock = Lock()
+        self.extraction_cache = ExtractionCache(
+            self.config.get("extraction", {}).get("cache_dir", DEFAULT_CACHE_DIR)
+        )
+        # 分析规则在进程内只编译一次，所有工作线程只读共享
+        self.rules_profile = self.config.get("analysis", {}).get("rules_profile")
+        self.rules_hot_reload = self.config.get("analysis", {}).get("hot_reload", True)
+        self.short_circuit = self.config.get("analysis", {}).get("short_circuit", False)
+        # 只运行选中的分析项，未配置时运行全部分析项
+        self.analyzers = select_analyzers(self.config.get("analysis", {}).get("analyzers"))
+        self.write_report = self.config.get("analysis", {}).get("write_report", True)
+        self.rule_set = get_rule_set(self.rules_profile)
+        self.incremental = self.config.get("batch", {}).get("incremental", True)
+        self.fingerprints = FingerprintStore(
+            self.config.get("batch", {}).get("fingerprint_file", FINGERPRINT_FILE)
+        )
+        dedup_config = self.config.get("deduplication", {})
+        self.dedup = None
+        if dedup_config.get("enabled", True):
+            self.dedup = DuplicateIndex(
+                threshold=dedup_config.get("threshold", 0.8),
+                num_perm=dedup_config.get("num_perm", 128),
+                bands=dedup_config.get("bands", 16),
+                store_file=dedup_config.get("index_file", DEDUP_INDEX_FILE),
+                min_shingles=dedup_config.get("min_shingles", MIN_SHINGLES)
+            )
         
     def _load_config(self, config_file):
         """加载配置文件"""
         with open(config_file, "r", encoding="utf-8") as f:
             return yaml.safe_load(f)
             
+    def _extract_workers(self):
+        """获取单篇论文按页并行提取的进程数"""
+        return self.config.get("extraction", {}).get("workers", 1)
+        
+    def _extract(self, source, workspace):
+        """使用批处理共享的提取缓存，从已验证的文件映射中将文本提取到论文工作目录"""
+        return extract_text(
+            source.path,
+            workers=self._extract_workers(),
+            cache=self.extraction_cache,
+            use_cache=self.config.get("extraction", {}).get("cache", True),
+            output_file=workspace.extracted_text,
+            report_file=workspace.extraction_report,
+            backend=self.config.get("extraction", {}).get("backend", "auto"),
+            page_timeout=self.config.get("extraction", {}).get("page_timeout"),
+            timeout=self.config.get("batch", {}).get("timeout"),
+            codec=self._compression(),
+            source=source
+        )
+        
+    def _compression(self):
+        """获取压缩文本产物使用的压缩算法"""
+        return self.config.get("extraction", {}).get("compression", "zlib")
+        
+    def _preprocess(self, workspace):
+        """预处理论文工作目录中的提取文本"""
+        return preprocess_text(
+            workspace.extracted_text,
+            output_file=workspace.preprocessed_text,
+            report_file=workspace.preprocessing_report,
+            codec=self._compression()
+        )
+        
+    def _task_rule_set(self):
+        """获取任务开始时的分析规则，规则文件修改后新任务使用新规则，进行中的任务不受影响"""
+        if self.rules_hot_reload:
+            self.rule_set = get_rule_set(self.rules_profile)
+        return self.rule_set
+        
+    def _claim_duplicate(self, workspace):
+        """在近重复索引中登记提取文本，返回 (原论文ID, 相似度)，不是重复论文时返回 None"""
+        if not self.dedup:
+            return None
+        return self.dedup.claim(workspace.paper_id, read_text_artifact(workspace.extracted_text))
+        
+    def _record_fingerprint(self, result, canonical=None):
+        """记录成功处理的论文指纹，使用提取时打开文件得到的大小、修改时间和内容哈希
+
+        存在提取失败页面的结果（包括沿用了这类原论文结果的重复论文）不记录，下次运行时重新处理。
+        """
+        if not self.incremental:
+            return
+        if result.get("failed_pages") or (canonical and canonical.get("failed_pages")):
+            self.fingerprints.forget(result["paper_id"])
+            return
+        self.fingerprints.record(result["paper_id"], result["file_info"]["pdf_path"], result,
+                                 fingerprint=result.get("fingerprint"))
+        
+    def _link_duplicates(self):
+        """将重复论文链接到原论文的分析结果，原论文处理失败时重复论文也记为失败"""
+        with self.results_lock:
+            by_paper = {r.get("paper_id"): r for r in self.results if not r.get("duplicate_of")}
+            for result in self.results:
+                canonical_id = result.get("duplicate_of")
+                if not canonical_id or result.get("carried_forward"):
+                    continue
+                canonical = by_paper.get(canonical_id)
+                if canonical and canonical["status"] == "success":
+                    result["analysis_results"] = canonical.get("analysis_results")
+                    self._record_fingerprint(result, canonical)
+                else:
+                    result["status"] = "failed"
+                    result["error"] = f"重复论文的原论文 {canonical_id} 处理失败"
+                    self.fingerprints.forget(result["paper_id"])
+        
+    def _create_workspace(self, pdf_path):
+        """为论文创建独立的工作目录"""
+        root = self.config.get("output", {}).get("workspace_dir", WORKSPACE_ROOT)
+        artifact_format = self.config.get("extraction", {}).get("artifact_format", "text")
+        return PaperWorkspace(make_paper_id(pdf_path), root, artifact_format).create()
+            
     def scan_pdf_directory(self):
         """扫描PDF目录，获取所有PDF文件"""
         pdf_dir = Path(self.path_config["directories"]["papers"])
         if not pdf_dir.exists():
             raise Exception(f"PDF目录不存在：{pdf_dir}")
             
+        # 每次扫描重建一次目录索引，后续验证直接查索引
+        get_directory_index().refresh(pdf_dir)
+        
         pdf_files = []
         for file in pdf_dir.glob("*.pdf"):
             # 对文件路径进行编码，处理空格问题
             encoded_path = str(file).replace(" ", "%20")
             pdf_files.append({
+                "paper_id": make_paper_id(file),
                 "title": file.stem,
                 "pdf_path": str(file),
                 "encoded_path": encoded_path,
@@ -59,6 +175,82 @@ class BatchProcessor:
         """添加任务到队列"""
         self.task_queue.put(paper_info)
         
+    def prevalidate(self, papers):
+        """排队前并行检查所有论文的文件头和结束标记，未通过的论文直接记为失败
+        
+        Returns:
+            list: 通过检查的论文
+        """
+        workers = self.config.get("batch", {}).get("validation_workers", 8)
+        _, rejected = validate_pdfs([paper["pdf_path"] for paper in papers], workers=workers)
+        rejected = dict(rejected)
+        
+        accepted = []
+        for paper in papers:
+            reason = rejected.get(paper["pdf_path"])
+            if reason is None:
+                accepted.append(paper)
+                continue
+            
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"PDF预检未通过，跳过：{paper['title']}（{reason}）")
+            self.fingerprints.forget(paper["paper_id"])
+            with self.results_lock:
+                self.results.append({
+                    "task_id": self.get_next_task_id(),
+                    "paper_id": paper["paper_id"],
+                    "file_info": {
+                        "title": paper["title"],
+                        "pdf_path": paper["pdf_path"],
+                        "file_size": paper["file_size"],
+                        "last_modified": paper["last_modified"]
+                    },
+                    "status": "failed",
+                    "error": f"PDF预检失败：{reason}",
+                    "start_time": now,
+                    "end_time": now,
+                    "steps": [{"name": "validate_pdf", "status": "failed"}]
+                })
+        return accepted
+        
+    def carry_forward(self, paper_info):
+        """增量模式下，论文自上次成功处理后未变化时沿用上次的结果
+        
+        Returns:
+            bool: 是否沿用了上次的结果（沿用时无需再加入任务队列）
+        """
+        if not self.incremental:
+            return False
+        previous = self.fingerprints.lookup(paper_info["paper_id"], paper_info["pdf_path"])
+        if previous is None:
+            return False
+        if not self.rule_set.is_current(previous.get("analysis_results")):
+            print(f"分析规则已更新，重新分析：{paper_info['title']}")
+            return False
+        if any(name not in previous["analysis_results"] for name in self.analyzers):
+            print(f"上次结果缺少选中的分析项，重新分析：{paper_info['title']}")
+            return False
+        
+        result = dict(previous, task_id=self.get_next_task_id(), carried_forward=True)
+        if self.dedup and not result.get("duplicate_of"):
+            self.dedup.restore(paper_info["paper_id"])
+        with self.results_lock:
+            self.results.append(result)
+        print(f"论文未变化，沿用上次结果：{paper_info['title']}")
+        return True
+        
+    def queue_papers(self, papers):
+        """将扫描到的论文加入任务队列：增量模式下未变化的论文沿用上次结果，
+        其余论文并行预检文件头和结束标记，未通过的直接记为失败，不再排队
+        
+        Returns:
+            int: 加入任务队列的论文数量
+        """
+        pending = self.prevalidate([paper for paper in papers if not self.carry_forward(paper)])
+        for paper in pending:
+            self.add_task(paper)
+        return len(pending)
+        
     def get_next_task_id(self):
         """获取下一个任务ID"""
         with self.task_counter_lock:
@@ -75,9 +267,12 @@ class BatchProcessor:
                 break
                 
             task_id = self.get_next_task_id()
+            paper_id = make_paper_id(paper_info["pdf_path"])
             result = {
                 "task_id": task_id,
                 "worker_id": worker_id,
+                "paper_id": paper_id,
+                "workspace": None,
                 "file_info": {
                     "title": paper_info["title"],
                     "pdf_path": paper_info["pdf_path"],
@@ -90,57 +285,84 @@ class BatchProcessor:
             }
             
             try:
+                # 规则加载和工作目录创建也在 try 内，出错时只记录该任务失败，工作线程继续处理
+                rule_set = self._task_rule_set()
+                workspace = self._create_workspace(paper_info["pdf_path"])
+                result["workspace"] = str(workspace.root)
+                
                 print(f"\n开始处理论文：{paper_info['title']}")
                 print(f"文件信息：")
                 print(f"- 路径：{paper_info['pdf_path']}")
                 print(f"- 大小：{paper_info['file_size']:.2f} MB")
                 print(f"- 修改时间：{paper_info['last_modified']}")
                 
-                # 1. 验证PDF
-                if not validate_pdf(paper_info["pdf_path"]):
+                # 1. 验证PDF：文件以内存映射方式只打开一次，验证和文本提取共享该映射
+                source = open_validated_pdf(paper_info["pdf_path"])
+                if source is None:
                     raise Exception("PDF验证失败")
                 result["steps"].append({"name": "validate_pdf", "status": "success"})
                 print("PDF验证成功")
                 
                 # 2. 提取文本
-                if not extract_text(paper_info["pdf_path"]):
+                with source:
+                    extraction = self._extract(source, workspace)
+                if not extraction:
                     raise Exception("文本提取失败")
+                result["fingerprint"] = extraction["fingerprint"]
                 result["steps"].append({"name": "extract_text", "status": "success"})
-                print("文本提取成功")
-                
-                # 3. 预处理文本
-                text_file = "output/analysis/text/extracted_text.txt"
-                if not preprocess_text(text_file):
-                    raise Exception("文本预处理失败")
-                result["steps"].append({"name": "preprocess_text", "status": "success"})
-                print("文本预处理成功")
+                if extraction["failed_pages"]:
+                    # 部分页面提取失败的论文照常分析，但不记录指纹，下次运行时重新提取
+                    result["failed_pages"] = extraction["failed_pages"]
+                    print(f"文本提取部分成功，{len(extraction['failed_pages'])} 页提取失败")
+                else:
+                    print("文本提取成功")
                 
-                # 4. 准备分析规则
-                rules_dir = Path("output/analysis/rules")
-                if not prepare_analysis_rules(str(rules_dir)):
-                    raise Exception("规则准备失败")
-                result["steps"].append({"name": "prepare_rules", "status": "success"})
-                print("规则准备成功")
+                # 3. 近重复检测：与已登记论文近重复时直接链接到原论文的结果
+                duplicate = self._claim_duplicate(workspace)
+                if duplicate:
+                    result["duplicate_of"] = duplicate[0]
+                    result["similarity"] = round(duplicate[1], 3)
+                    result["steps"].append({"name": "deduplicate", "status": "duplicate"})
+                    print(f"检测到近重复论文（相似度 {duplicate[1]:.2f}），沿用论文 {duplicate[0]} 的分析结果")
+                else:
+                    # 4. 预处理文本
+                    if not self._preprocess(workspace):
+                        raise Exception("文本预处理失败")
+                    result["steps"].append({"name": "preprocess_text", "status": "success"})
+                    print("文本预处理成功")
                 
-                # 5. 分析论文
-                text_file = "output/analysis/text/preprocessed_text.txt"
-                rules_file = "output/analysis/rules/analysis_rules.json"
-                output_dir = "output/analysis/report"
-                analysis_results = analyze_paper(text_file=text_file, rules_file=rules_file, output_dir=output_dir)
-                if not analysis_results:
-                    raise Exception("论文分析失败")
-                result["steps"].append({"name": "analyze_paper", "status": "success"})
-                result["analysis_results"] = analysis_results
-                print("论文分析成功")
+                    # 5. 使用共享的已编译规则分析论文：规则在任务开始时取得，不再逐篇准备，
+                    #    这一步只记录本任务实际使用的规则版本和哈希
+                    result["steps"].append({"name": "prepare_rules", "status": "success", "rules": rule_set.stamp})
+                    analysis_results = analyze_paper(
+                        text_file=str(workspace.preprocessed_text),
+                        rules_file=None,
+                        output_dir=str(workspace.report_dir),
+                        rule_set=rule_set,
+                        short_circuit=self.short_circuit,
+                        analyzers=self.analyzers,
+                        write_report=self.write_report
+                    )
+                    if not analysis_results:
+                        raise Exception("论文分析失败")
+                    result["steps"].append({"name": "analyze_paper", "status": "success"})
+                    result["analysis_results"] = analysis_results
+                    print("论文分析成功")
                 
                 result["status"] = "success"
                 result["end_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                # 重复论文在链接到原论文结果后再记录指纹
+                if not duplicate:
+                    self._record_fingerprint(result)
                 print(f"论文处理完成：{paper_info['title']}")
                 
             except Exception as e:
                 result["status"] = "failed"
                 result["error"] = str(e)
                 result["end_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.fingerprints.forget(paper_id)
+                if self.dedup:
+                    self.dedup.discard(paper_id)
                 print(f"处理论文时出错: {str(e)}")
                 
                 # 如果配置为跳过失败任务
@@ -182,32 +404,29 @@ class BatchProcessor:
             print(f"- 大小：{file_info['file_size']:.2f} MB")
             print(f"- 修改时间：{file_info['last_modified']}")
             
-            # 1. 验证PDF文件
-            if not validate_pdf(file_info['pdf_path']):
+            # 1. 验证PDF文件：文件以内存映射方式只打开一次，验证和文本提取共享该映射
+            source = open_validated_pdf(file_info['pdf_path'])
+            if source is None:
                 raise Exception("PDF验证失败")
             print("PDF验证成功")
             
-            # 2. 提取文本
-            text_file = Path("output/analysis/text/extracted_text.txt")
-            if not extract_text(file_info['pdf_path']):
-                raise Exception("文本提取失败")
+            with source:
+                workspace = self._create_workspace(pdf_file)
+                
+                # 2. 提取文本
+                if not self._extract(source, workspace):
+                    raise Exception("文本提取失败")
             print("文本提取成功")
             
             # 3. 预处理文本
-            preprocessed_text_file = Path("output/analysis/text/preprocessed_text.txt")
-            if not preprocess_text(text_file):
+            if not self._preprocess(workspace):
                 raise Exception("文本预处理失败")
             print("文本预处理成功")
             
-            # 4. 准备分析规则
-            rules_dir = Path("output/analysis/rules")
-            if not prepare_analysis_rules(str(rules_dir)):
-                raise Exception("规则准备失败")
-            print("规则准备成功")
-            
-            # 5. 分析论文
-            output_dir = Path("output/analysis/report")
-            results = analyze_paper(str(preprocessed_text_file), str(rules_dir / "analysis_rules.json"), str(output_dir))
+            # 4. 使用共享的已编译规则分析论文
+            results = analyze_paper(str(workspace.preprocessed_text), None, str(workspace.report_dir),
+                                    rule_set=self._task_rule_set(), short_circuit=self.short_circuit,
+                                    analyzers=self.analyzers, write_report=self.write_report)
             if not results:
                 raise Exception("论文分析失败")
             print("论文分析成功")
@@ -301,7 +520,12 @@ class BatchProcessor:
             
             # 准备结果数据
             end_time = datetime.now()
-            start_time = min(r["start_time"] for r in self.results) if self.results else "未知"
+            self._link_duplicates()
+            
+            # 沿用上次结果的论文不参与本次耗时统计
+            processed = [r for r in self.results if not r.get("carried_forward")]
+            carried_forward = len(self.results) - len(processed)
+            start_time = min(r["start_time"] for r in processed) if processed else "未知"
             
             # 计算总耗时（分钟）
             if start_time != "未知":
@@ -312,8 +536,9 @@ class BatchProcessor:
                 
             # 计算平均耗时（秒）
             successful_tasks = [r for r in self.results if r["status"] == "success"]
-            if successful_tasks:
-                avg_duration = total_duration * 60 / len(successful_tasks)
+            processed_successes = len(successful_tasks) - carried_forward
+            if processed_successes:
+                avg_duration = total_duration * 60 / processed_successes
             else:
                 avg_duration = 0
                 
@@ -326,6 +551,10 @@ class BatchProcessor:
                 "total_tasks": len(self.results),
                 "successful_tasks": len(successful_tasks),
                 "failed_tasks": len(self.results) - len(successful_tasks),
+                "carried_forward_tasks": carried_forward,
+                "duplicate_tasks": sum(1 for r in self.results if r.get("duplicate_of")),
+                "extraction_cache": self.extraction_cache.stats(),
+                "rules": self.rule_set.stamp,
                 "tasks": self.results
             }
             
@@ -340,6 +569,11 @@ class BatchProcessor:
             with open(report_file, "w", encoding="utf-8") as f:
                 f.write(report)
                 
+            if self.incremental:
+                self.fingerprints.save()
+            if self.dedup:
+                self.dedup.save()
+                
             print("\n批处理完成！")
             print(f"结果文件：{results_file}")
             print(f"报告文件：{report_file}")
@@ -369,15 +603,33 @@ class BatchProcessor:
             f"- 总任务数：{results['total_tasks']}",
             f"- 成功：{results['successful_tasks']}",
             f"- 失败：{results['failed_tasks']}",
+            f"- 沿用上次结果：{results['carried_forward_tasks']}",
+            f"- 近重复论文：{results['duplicate_tasks']}",
             f"- 成功率：{(results['successful_tasks'] / results['total_tasks'] * 100):.2f}%",
             "\n## 时间统计",
             f"- 开始时间：{results['start_time']}",
             f"- 结束时间：{results['end_time']}",
             f"- 总耗时：{results['total_duration']:.2f} 分钟",
             f"- 平均耗时：{results['avg_duration']:.2f} 秒",
+            "\n## 分析规则",
+            f"- 版本：{results['rules']['version']}",
+            f"- 内容哈希：{results['rules']['hash']}",
+            "\n## 提取缓存",
+            f"- 命中：{results['extraction_cache']['hits']}",
+            f"- 未命中：{results['extraction_cache']['misses']}",
             "\n## 论文分析汇总"
         ]
         
+        # 列出近重复论文及其链接的原论文
+        duplicates = [r for r in results["tasks"] if r.get("duplicate_of")]
+        if duplicates:
+            index = report.index("\n## 论文分析汇总")
+            lines = ["\n## 近重复论文"]
+            for r in duplicates:
+                similarity = f"（相似度 {r['similarity']:.2f}）" if r.get("similarity") is not None else ""
+                lines.append(f"- {r['file_info']['title']} → {r['duplicate_of']}{similarity}")
+            report[index:index] = lines
+        
         # 添加结果表格
         report.append(self._generate_summary_table(results["tasks"]))
         
@@ -406,9 +658,8 @@ def main():
         pdf_files = processor.scan_pdf_directory()
         print(f"找到 {len(pdf_files)} 篇待处理论文")
         
-        # 添加任务到队列
-        for paper in pdf_files:
-            processor.add_task(paper)
+        # 未变化的论文沿用上次结果，其余论文预检通过后加入任务队列
+        processor.queue_papers(pdf_files)
             
         # 启动处理
         processor.start()
@@ -0,0 +1,86 @@
+import os
+import json
+from pathlib import Path
+from datetime import datetime
+from threading import Lock
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.preprocessing.extraction_cache import file_sha256
+
+FINGERPRINT_FILE = "output/cache/paper_fingerprints.json"
+
+def stat_fingerprint(pdf_path):
+    """读取文件大小和修改时间（纳秒）作为快速指纹"""
+    stat = Path(pdf_path).stat()
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+class FingerprintStore:
+    """按论文ID保存文件指纹和上次成功处理的结果，用于增量批处理。
+
+    指纹先比较文件大小和修改时间；大小相同而修改时间变化时，再用内容哈希确认，
+    内容未变的论文沿用上次的处理结果。
+    """
+
+    def __init__(self, store_file=FINGERPRINT_FILE):
+        """加载已保存的指纹记录"""
+        self.store_file = Path(store_file)
+        self.entries = {}
+        self._lock = Lock()
+        if self.store_file.exists():
+            try:
+                with open(self.store_file, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取指纹记录时出错，将重新处理所有论文：{str(e)}")
+                self.entries = {}
+
+    def lookup(self, paper_id, pdf_path):
+        """论文自上次成功处理后未变化时返回上次的结果，否则返回 None"""
+        with self._lock:
+            entry = self.entries.get(paper_id)
+        if not entry:
+            return None
+
+        fingerprint = stat_fingerprint(pdf_path)
+        if fingerprint["size"] != entry["size"]:
+            return None
+        if fingerprint["mtime"] != entry["mtime"]:
+            # 修改时间变化但大小相同（如重新复制），以内容哈希为准
+            if file_sha256(pdf_path) != entry["sha256"]:
+                return None
+            with self._lock:
+                entry["mtime"] = fingerprint["mtime"]
+        return entry["result"]
+
+    def record(self, paper_id, pdf_path, result, fingerprint=None):
+        """记录论文的指纹和成功处理的结果
+
+        fingerprint 为提取时打开文件得到的指纹（大小、修改时间、内容哈希），与处理结果对应同一版本的文件；
+        提供时直接记录，处理期间文件被替换也不会把新文件的指纹与旧结果记在一起。
+        """
+        if fingerprint is None:
+            fingerprint = dict(stat_fingerprint(pdf_path), sha256=file_sha256(pdf_path))
+        entry = dict(size=fingerprint["size"],
+                     mtime=fingerprint["mtime"],
+                     sha256=fingerprint["sha256"],
+                     pdf_path=str(pdf_path),
+                     result=result,
+                     updated=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        with self._lock:
+            self.entries[paper_id] = entry
+
+    def forget(self, paper_id):
+        """删除论文的指纹记录，下次运行时重新处理"""
+        with self._lock:
+            self.entries.pop(paper_id, None)
+
+    def save(self):
+        """保存指纹记录，先写临时文件再原子替换"""
+        self.store_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.store_file.with_name(self.store_file.name + f".{os.getpid()}.tmp")
+        with self._lock:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.store_file)
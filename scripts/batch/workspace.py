@@ -0,0 +1,52 @@
+import os
+import re
+import hashlib
+from pathlib import Path
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.preprocessing.page_store import artifact_suffix
+
+WORKSPACE_ROOT = "output/analysis/workspaces"
+
+def make_paper_id(pdf_path):
+    """根据文件名生成稳定的论文ID，附加路径哈希避免同名文件冲突"""
+    path = Path(pdf_path)
+    stem = path.stem.replace('\xa0', ' ').strip()
+    slug = re.sub(r'[^\w\-]+', '_', stem).strip('_')[:60] or "paper"
+    digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:8]
+    return f"{slug}-{digest}"
+
+class PaperWorkspace:
+    """单篇论文的独立工作目录，批处理中每个任务只读写自己的工作目录"""
+
+    def __init__(self, paper_id, root=WORKSPACE_ROOT, artifact_format="text"):
+        """初始化工作目录路径，artifact_format 为 compressed 时文本产物按页压缩保存"""
+        self.paper_id = paper_id
+        self.text_suffix = artifact_suffix(artifact_format)
+        self.root = Path(root) / paper_id
+        self.text_dir = self.root / "text"
+        self.report_dir = self.root / "report"
+
+    def create(self):
+        """创建工作目录结构"""
+        for directory in (self.text_dir, self.report_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        return self
+
+    @property
+    def extracted_text(self):
+        return self.text_dir / f"extracted_text{self.text_suffix}"
+
+    @property
+    def preprocessed_text(self):
+        return self.text_dir / f"preprocessed_text{self.text_suffix}"
+
+    @property
+    def extraction_report(self):
+        return self.report_dir / "extraction_result.md"
+
+    @property
+    def preprocessing_report(self):
+        return self.report_dir / "preprocessing_result.md"
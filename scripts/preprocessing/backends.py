@@ -0,0 +1,170 @@
+import io
+from threading import RLock
+
+# pdfium 库不是线程安全的，同一进程内对它的所有调用（包括不同文档）都需要串行执行
+_PDFIUM_LOCK = RLock()
+
+class ExtractionBackend:
+    """文本提取后端基类。
+
+    子类负责把 PdfSource 打开为文档对象，文档对象需提供 page_count、
+    extract_page(index) 和 metadata() 三个接口。
+    """
+
+    name = None
+    module = None
+
+    @classmethod
+    def is_available(cls):
+        """后端依赖是否已安装"""
+        try:
+            __import__(cls.module)
+            return True
+        except ImportError:
+            return False
+
+    @property
+    def version(self):
+        """后端名称与依赖版本，用于区分不同后端的提取缓存"""
+        module = __import__(self.module)
+        return f"{self.name}-{getattr(module, '__version__', 'unknown')}"
+
+    def open(self, source):
+        """打开文档，返回文档对象"""
+        raise NotImplementedError
+
+class PyPDF2Backend(ExtractionBackend):
+    """基于 PyPDF2 的默认提取后端"""
+
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    class Document:
+        def __init__(self, source):
+            from PyPDF2 import PdfReader
+            self.reader = PdfReader(source.stream())
+            self.page_count = len(self.reader.pages)
+
+        def extract_page(self, index):
+            return self.reader.pages[index].extract_text()
+
+        def metadata(self):
+            info = self.reader.metadata or {}
+            return {name: info.get(key) for key, name in
+                    (("/Title", "title"), ("/Author", "author"), ("/Subject", "subject"))}
+
+    def open(self, source):
+        return self.Document(source)
+
+class PdfiumBackend(ExtractionBackend):
+    """基于 pypdfium2 的提取后端"""
+
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    class Document:
+        def __init__(self, source):
+            import pypdfium2
+            # 从已建立的内存映射读取，不再按路径重新打开文件
+            with _PDFIUM_LOCK:
+                self.pdf = pypdfium2.PdfDocument(source.reader())
+                self.page_count = len(self.pdf)
+
+        def extract_page(self, index):
+            with _PDFIUM_LOCK:
+                page = self.pdf[index]
+                try:
+                    text_page = page.get_textpage()
+                    try:
+                        return text_page.get_text_range().replace("\r\n", "\n")
+                    finally:
+                        text_page.close()
+                finally:
+                    page.close()
+
+        def metadata(self):
+            with _PDFIUM_LOCK:
+                info = self.pdf.get_metadata_dict()
+            return {name: info.get(key) for key, name in
+                    (("Title", "title"), ("Author", "author"), ("Subject", "subject"))}
+
+    def open(self, source):
+        return self.Document(source)
+
+class PdfminerBackend(ExtractionBackend):
+    """基于 pdfminer.six 的提取后端"""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    class Document:
+        def __init__(self, source):
+            from pdfminer.pdfparser import PDFParser
+            from pdfminer.pdfdocument import PDFDocument
+            from pdfminer.pdfpage import PDFPage
+            self.document = PDFDocument(PDFParser(source.stream()))
+            self.pages = list(PDFPage.create_pages(self.document))
+            self.page_count = len(self.pages)
+
+        def extract_page(self, index):
+            from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+            from pdfminer.converter import TextConverter
+            from pdfminer.layout import LAParams
+            output = io.StringIO()
+            manager = PDFResourceManager()
+            device = TextConverter(manager, output, laparams=LAParams())
+            try:
+                PDFPageInterpreter(manager, device).process_page(self.pages[index])
+            finally:
+                device.close()
+            return output.getvalue().rstrip("\x0c")
+
+        def metadata(self):
+            info = self.document.info[0] if self.document.info else {}
+            result = {}
+            for key, name in (("Title", "title"), ("Author", "author"), ("Subject", "subject")):
+                value = info.get(key)
+                if isinstance(value, bytes):
+                    value = value.decode("utf-8", errors="ignore")
+                result[name] = value
+            return result
+
+    def open(self, source):
+        return self.Document(source)
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (PyPDF2Backend, PdfiumBackend, PdfminerBackend)
+}
+
+# 自动选择时的优先顺序：已安装的更快引擎优先。
+# pdfminer 的版面分析通常比 PyPDF2 慢，只在显式指定时使用
+AUTO_PREFERENCE = ["pypdfium2", "pypdf2", "pdfminer"]
+
+DEFAULT_BACKEND = "pypdf2"
+
+def available_backends():
+    """按自动选择的优先顺序返回当前环境中已安装的后端名称列表"""
+    return [name for name in AUTO_PREFERENCE if BACKENDS[name].is_available()]
+
+def get_backend(name="auto"):
+    """获取提取后端实例
+
+    Args:
+        name (str): 后端名称，"auto" 表示按优先顺序选择已安装的后端
+
+    Returns:
+        ExtractionBackend: 后端实例
+    """
+    if not name or name == "auto":
+        available = available_backends()
+        return BACKENDS[available[0] if available else DEFAULT_BACKEND]()
+
+    if name not in BACKENDS:
+        raise ValueError(f"未知的提取后端：{name}，可选值：{', '.join(BACKENDS)}")
+
+    if not BACKENDS[name].is_available():
+        print(f"提取后端 {name} 未安装，改用 {DEFAULT_BACKEND}")
+        return BACKENDS[DEFAULT_BACKEND]()
+
+    return BACKENDS[name]()
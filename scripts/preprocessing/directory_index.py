@@ -0,0 +1,75 @@
+import os
+import re
+from threading import Lock
+
+# 文件名中常见的不可见字符：零宽空格、零宽连接符、字节顺序标记
+_INVISIBLE_CHARS = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_filename(filename):
+    """规范化文件名：移除不可见字符，将不间断空格等各类空白统一为单个空格"""
+    filename = filename.translate(_INVISIBLE_CHARS)
+    return _WHITESPACE.sub(' ', filename).strip()
+
+class DirectoryIndex:
+    """缓存目录下规范化文件名到实际文件名的映射。
+
+    每个目录只用 os.scandir 扫描一次，目录修改时间变化时重新扫描，
+    避免批处理中每验证一个文件都重新列出并规范化整个目录。
+    """
+
+    def __init__(self):
+        """初始化空索引"""
+        self._entries = {}
+        self._lock = Lock()
+
+    def _scan(self, directory):
+        """扫描目录，返回 (目录修改时间, 实际文件名集合, 规范化文件名映射)"""
+        mtime = os.stat(directory).st_mtime_ns
+        names = set()
+        normalized = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                names.add(entry.name)
+                normalized.setdefault(normalize_filename(entry.name), entry.name)
+        return mtime, names, normalized
+
+    def refresh(self, directory):
+        """重新扫描目录并更新索引"""
+        key = os.path.abspath(directory)
+        entry = self._scan(directory)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _get(self, directory):
+        """获取目录索引，目录修改时间变化时重新扫描"""
+        key = os.path.abspath(directory)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != os.stat(directory).st_mtime_ns:
+            entry = self.refresh(directory)
+        return entry
+
+    def lookup(self, directory, filename):
+        """查找目录中与给定文件名匹配的实际文件名，找不到时返回 None"""
+        _, names, normalized = self._get(directory)
+        if filename in names:
+            return filename
+        actual = normalized.get(normalize_filename(filename))
+        if actual is None:
+            # 修改时间精度有限，未命中时重新扫描一次，避免漏掉刚写入的文件
+            _, names, normalized = self.refresh(directory)
+            actual = filename if filename in names else normalized.get(normalize_filename(filename))
+        return actual
+
+_default_index = None
+_default_index_lock = Lock()
+
+def get_directory_index():
+    """获取进程内共享的目录索引"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = DirectoryIndex()
+        return _default_index
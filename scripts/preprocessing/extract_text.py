@@ -1,61 +1,279 @@
 import os
+import hashlib
 from pathlib import Path
-from PyPDF2 import PdfReader
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from scripts.preprocessing.validate_pdf import validate_pdf
+from scripts.preprocessing.validate_pdf import open_validated_pdf
+from scripts.preprocessing.pdf_source import PdfSource
+from scripts.preprocessing.extraction_cache import get_default_cache
+from scripts.preprocessing.backends import get_backend
+from scripts.preprocessing.page_watchdog import iter_pages_with_watchdog, MP_CONTEXT
+from scripts.preprocessing.page_store import open_text_output
 
-def extract_text(pdf_path):
-    """从 PDF 文件中提取文本内容"""
-    try:
-        # 首先验证 PDF 文件
-        validated_path = validate_pdf(pdf_path)
-        if not validated_path:
-            print("PDF 文件验证失败，无法继续提取文本")
-            return False
-            
-        # 读取 PDF 文件
-        reader = PdfReader(str(validated_path))
-        total_pages = len(reader.pages)
-        print(f"PDF 文件共有 {total_pages} 页")
-        
-        # 提取文本
-        text_content = []
-        for i, page in enumerate(reader.pages, 1):
+# 提取逻辑修订号，提取逻辑或输出格式变化时需要递增，以使旧缓存失效
+EXTRACTOR_REVISION = 1
+
+def extractor_version(backend):
+    """提取器版本：后端名称、后端依赖版本和提取逻辑修订号"""
+    return f"{backend.version}-r{EXTRACTOR_REVISION}"
+
+def _extract_page_range(pdf_path, start, end, backend_name):
+    """在子进程中提取 [start, end) 范围内各页的文本"""
+    with PdfSource(pdf_path) as source:
+        document = get_backend(backend_name).open(source)
+        return [document.extract_page(i) for i in range(start, end)]
+
+def _split_page_ranges(total_pages, workers):
+    """将页码范围切分为若干连续区间，区间数略多于进程数以均衡负载"""
+    chunk_size = max(1, -(-total_pages // (workers * 4)))
+    return [(start, min(start + chunk_size, total_pages))
+            for start in range(0, total_pages, chunk_size)]
+
+def _extract_pages_parallel(pdf_path, total_pages, workers, backend_name):
+    """使用进程池按页并行提取文本，结果按页码顺序返回"""
+    ranges = _split_page_ranges(total_pages, workers)
+    # 与受监控的提取子进程一样以 spawn 方式启动，避免从工作线程 fork 时继承被其他线程持有的锁
+    with ProcessPoolExecutor(max_workers=workers, mp_context=MP_CONTEXT) as executor:
+        # map 按提交顺序返回结果，保证页面顺序确定
+        chunks = executor.map(
+            _extract_page_range,
+            [str(pdf_path)] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+            [backend_name] * len(ranges)
+        )
+        page_no = 0
+        for chunk in chunks:
+            for text in chunk:
+                page_no += 1
+                yield page_no, text
+
+def _iter_document_pages(document, pdf_path, workers, backend_name, page_timeout=None, timeout=None):
+    """按页码顺序产出已打开文档的 (页码, 文本, 错误信息)
+    
+    设置了单页或整篇文档的时间预算时，页面在受监控的子进程中提取，
+    超时的页面被跳过并返回错误信息。
+    """
+    total_pages = document.page_count
+    if page_timeout or timeout:
+        yield from iter_pages_with_watchdog(
+            pdf_path, total_pages, backend_name,
+            page_timeout=page_timeout or timeout,
+            workers=workers,
+            timeout=timeout
+        )
+    elif workers > 1 and total_pages > 1:
+        for i, text in _extract_pages_parallel(pdf_path, total_pages, workers, backend_name):
+            yield i, text, None
+    else:
+        for i in range(total_pages):
+            yield i + 1, document.extract_page(i), None
+
+def iter_page_texts(pdf_path, workers=1, backend="auto", page_timeout=None):
+    """逐页提取 PDF 文本，按页码顺序产出 (page_no, text) 元组。
+    
+    页面文本在提取完成后立即产出，调用方无需等待整篇文档处理完毕，
+    内存占用与单页文本大小相当。
+    
+    Args:
+        pdf_path (str): PDF 文件路径
+        workers (int): 按页并行提取的进程数，1 表示在当前进程中逐页提取
+        backend (str): 提取后端名称，"auto" 表示自动选择已安装的最快后端
+        page_timeout (float): 单页提取的时间预算（秒），超时的页面产出的文本为 None
+    
+    Yields:
+        tuple: (页码, 页面文本)，页码从 1 开始
+    """
+    backend = get_backend(backend)
+    with PdfSource(pdf_path) as source:
+        document = backend.open(source)
+        pages = _iter_document_pages(document, source.path, max(1, int(workers or 1)),
+                                     backend.name, page_timeout=page_timeout)
+        for i, text, _ in pages:
+            yield i, text
+
+def _write_page_texts(source, output_file, workers, backend, page_timeout=None, timeout=None,
+                      codec="zlib"):
+    """逐页提取文本并写入输出文件，返回 (总页数, 文本大小, 失败页面列表)
+    
+    输出文件后缀为 .pz 时写入按页压缩的文本产物。
+    """
+    document = backend.open(source)
+    total_pages = document.page_count
+    print(f"PDF 文件共有 {total_pages} 页")
+    
+    if workers > 1 and total_pages > 1:
+        print(f"使用 {workers} 个进程并行提取")
+    
+    # 每页提取完成后立即写入文件
+    text_size = 0
+    failed_pages = []
+    pages = _iter_document_pages(document, source.path, workers, backend.name,
+                                 page_timeout=page_timeout, timeout=timeout)
+    with open_text_output(output_file, codec=codec) as f:
+        for i, text, error in pages:
             print(f"正在处理第 {i}/{total_pages} 页...")
-            text = page.extract_text()
-            text_content.append(f"=== 第 {i} 页 ===\n{text}\n")
+            if error is not None:
+                print(f"第 {i} 页提取失败：{error}")
+                failed_pages.append((i, error))
+                text = ""
+            page_text = f"=== 第 {i} 页 ===\n{text}\n"
+            if i > 1:
+                page_text = "\n" + page_text
+            f.write(page_text)
+            text_size += len(page_text)
+    
+    return total_pages, text_size, failed_pages
+
+def extract_front_matter(pdf_path, max_pages=2, backend="auto"):
+    """快速读取 PDF 的文档信息字典和前几页文本，不做全文提取。
+    
+    Args:
+        pdf_path (str): PDF 文件路径
+        max_pages (int): 读取的最大页数
+        backend (str): 提取后端名称
+    
+    Returns:
+        dict: 包含页数、文档元数据和前几页文本的字典
+    """
+    with PdfSource(pdf_path) as source:
+        document = get_backend(backend).open(source)
+        total_pages = document.page_count
         
-        # 合并所有页面的文本
-        full_text = "\n".join(text_content)
+        metadata = {}
+        try:
+            for name, value in document.metadata().items():
+                if value and str(value).strip():
+                    metadata[name] = str(value).strip()
+        except Exception as e:
+            print(f"读取文档信息时出错: {str(e)}")
         
-        # 保存文本文件
-        output_dir = Path("output/analysis/text")
-        output_dir.mkdir(parents=True, exist_ok=True)
+        # 与全文提取使用相同的页面标记格式，便于复用后续的分析函数
+        text_content = []
+        for i in range(min(max_pages, total_pages)):
+            text_content.append(f"=== 第 {i + 1} 页 ===\n{document.extract_page(i)}\n")
+    
+    return {
+        "page_count": total_pages,
+        "metadata": metadata,
+        "text": "\n".join(text_content)
+    }
+
+def extract_text(pdf_path, workers=1, cache=None, use_cache=True,
+                 output_file="output/analysis/text/extracted_text.txt",
+                 report_file="output/analysis/report/extraction_result.md",
+                 backend="auto", page_timeout=None, timeout=None, codec="zlib", source=None):
+    """从 PDF 文件中提取文本内容，逐页写入输出文件
+    
+    Args:
+        pdf_path (str): PDF 文件路径
+        workers (int): 按页并行提取的进程数，1 表示在当前进程中逐页提取
+        cache (ExtractionCache): 提取缓存，为 None 时使用默认缓存
+        use_cache (bool): 是否使用提取缓存
+        output_file (str): 提取文本的输出文件路径
+        report_file (str): 提取报告的输出文件路径
+        backend (str): 提取后端名称，"auto" 表示自动选择已安装的最快后端
+        page_timeout (float): 单页提取的时间预算（秒），超时的页面被跳过并记录为失败
+        timeout (float): 整篇文档提取的时间预算（秒）
+        codec (str): 输出文件后缀为 .pz 时使用的压缩算法：zlib 或 lzma
+        source (PdfSource): 调用方已打开并验证过的文件映射，提供时直接使用（由调用方关闭），
+            不再查找、打开和验证文件
+    
+    Returns:
+        dict: 提取成功时返回提取信息（源文件、文件指纹、总页数、失败页码列表），失败时返回 False。
+            文件指纹包含打开文件时的大小、修改时间和内容哈希，三者来自同一时刻
+    """
+    try:
+        # 首先查找实际文件，并以内存映射方式只打开一次，验证与提取共享该映射
+        owns_source = source is None
+        if owns_source:
+            source = open_validated_pdf(pdf_path)
+            if source is None:
+                print("PDF 文件验证失败，无法继续提取文本")
+                return False
         
-        output_file = output_dir / "extracted_text.txt"
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(full_text)
+        with source if owns_source else nullcontext(source):
+            validated_path = source.path
+            
+            # 文件内容哈希只计算一次，供提取缓存和调用方（如增量处理的指纹记录）共用
+            digest = hashlib.sha256(source.buffer).hexdigest()
+            workers = max(1, int(workers or 1))
+            backend = get_backend(backend)
+            version = extractor_version(backend)
+            print(f"提取后端：{backend.name}")
+            
+            output_file = Path(output_file)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            # 查找提取缓存
+            cached = None
+            cache_status = "未启用"
+            if use_cache:
+                cache = cache or get_default_cache()
+                cache_key = cache.make_key(validated_path, version, digest=digest)
+                cached = cache.lookup(cache_key)
+                cache_status = "命中" if cached else "未命中"
+            
+            failed_pages = []
+            if cached:
+                print("命中提取缓存，跳过文本提取")
+                cache.restore(cached, output_file)
+                total_pages = cached["total_pages"]
+                text_size = cached["text_size"]
+            else:
+                total_pages, text_size, failed_pages = _write_page_texts(
+                    source, output_file, workers, backend,
+                    page_timeout=page_timeout, timeout=timeout, codec=codec
+                )
+                # 存在失败页面的结果不写入缓存，下次重新提取
+                if use_cache and not failed_pages:
+                    cache.store(cache_key, output_file, {
+                        "source": str(validated_path),
+                        "extractor_version": version,
+                        "total_pages": total_pages,
+                        "text_size": text_size
+                    })
             
         print(f"\n文本提取完成！")
         print(f"输出文件：{output_file}")
-        print(f"文本大小：{len(full_text) / 1024:.2f} KB")
+        print(f"文本大小：{text_size / 1024:.2f} KB")
         
         # 生成提取报告
-        report_path = Path("output/analysis/report/extraction_result.md")
+        report_path = Path(report_file)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
         with open(report_path, "w", encoding="utf-8") as f:
             f.write("# PDF 文本提取报告\n\n")
             f.write("## 处理信息\n")
             f.write(f"- 源文件：{validated_path}\n")
             f.write(f"- 总页数：{total_pages} 页\n")
+            f.write(f"- 提取后端：{backend.name}\n")
+            f.write(f"- 提取进程数：{workers}\n")
+            f.write(f"- 提取缓存：{cache_status}\n")
             f.write(f"- 输出文件：{output_file}\n")
-            f.write(f"- 文本大小：{len(full_text) / 1024:.2f} KB\n")
+            f.write(f"- 文本大小：{text_size / 1024:.2f} KB\n")
             f.write("\n## 提取结果\n")
-            f.write("- ✓ 文本提取成功\n")
+            if failed_pages:
+                f.write(f"- ⚠ 文本提取部分成功，{len(failed_pages)} 页提取失败\n")
+                f.write("\n## 失败页面\n")
+                for page_no, error in failed_pages:
+                    f.write(f"- 第 {page_no} 页：{error}\n")
+            else:
+                f.write("- ✓ 文本提取成功\n")
+        
+        if total_pages and len(failed_pages) == total_pages:
+            print("所有页面均提取失败")
+            return False
             
-        return True
+        return {
+            "source": str(validated_path),
+            "fingerprint": {"size": source.stat.st_size, "mtime": source.stat.st_mtime_ns, "sha256": digest},
+            "total_pages": total_pages,
+            "failed_pages": [page_no for page_no, _ in failed_pages]
+        }
         
     except Exception as e:
         print(f"文本提取过程中出现错误: {str(e)}")
@@ -0,0 +1,105 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from threading import Lock
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.preprocessing.page_store import copy_text_artifact, ARTIFACT_SUFFIX
+
+DEFAULT_CACHE_DIR = "output/cache/extraction"
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """分块计算文件的 SHA-256 摘要"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """以 PDF 内容哈希和提取器版本为键的持久化文本提取缓存
+
+    缓存条目统一以按页压缩的文本产物保存，取出时按目标文件后缀转换格式。
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        """初始化提取缓存"""
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def make_key(self, pdf_path, extractor_version, buffer=None, digest=None):
+        """根据文件内容和提取器版本生成缓存键
+
+        提供 digest（已计算的内容 SHA-256）时直接使用；提供 buffer（如 PdfSource 的内存映射）时
+        直接对其计算哈希，不再重新打开文件。
+        """
+        if digest is None:
+            digest = hashlib.sha256(buffer).hexdigest() if buffer is not None else file_sha256(pdf_path)
+        return f"{digest}-{extractor_version}"
+
+    def _entry_paths(self, key):
+        """缓存条目的文本文件和元数据文件路径"""
+        entry_dir = self.cache_dir / key[:2]
+        return entry_dir / f"{key}{ARTIFACT_SUFFIX}", entry_dir / f"{key}.json"
+
+    def lookup(self, key):
+        """查找缓存条目，命中时返回元数据字典，未命中返回 None"""
+        text_path, meta_path = self._entry_paths(key)
+        meta = None
+        if text_path.exists() and meta_path.exists():
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                meta["text_file"] = str(text_path)
+            except (OSError, ValueError):
+                meta = None
+
+        with self._lock:
+            if meta is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return meta
+
+    def store(self, key, text_file, meta):
+        """将提取结果写入缓存，先写临时文件再原子替换"""
+        text_path, meta_path = self._entry_paths(key)
+        text_path.parent.mkdir(parents=True, exist_ok=True)
+
+        meta = dict(meta, key=key, created=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        suffix = f".{os.getpid()}.{id(meta)}.tmp"
+        tmp_text = text_path.with_name(text_path.name + suffix)
+        tmp_meta = meta_path.with_name(meta_path.name + suffix)
+        # 临时文件保留压缩产物后缀，确保写入的是压缩格式
+        tmp_text = tmp_text.with_name(tmp_text.name + ARTIFACT_SUFFIX)
+        copy_text_artifact(text_file, tmp_text)
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_text, text_path)
+        os.replace(tmp_meta, meta_path)
+
+    def restore(self, meta, output_file):
+        """将命中的缓存条目复制到输出文件，格式由输出文件后缀决定"""
+        copy_text_artifact(meta["text_file"], output_file)
+
+    def stats(self):
+        """返回命中与未命中次数"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+_default_cache = None
+_default_cache_lock = Lock()
+
+def get_default_cache():
+    """获取进程内共享的默认提取缓存"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ExtractionCache()
+        return _default_cache
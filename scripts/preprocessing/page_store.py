@@ -0,0 +1,222 @@
+import re
+import json
+import lzma
+import zlib
+import shutil
+import struct
+from pathlib import Path
+
+# 压缩文本产物的文件后缀
+ARTIFACT_SUFFIX = ".pz"
+
+# 文本产物格式与文件后缀的对应关系
+ARTIFACT_FORMATS = {
+    "text": ".txt",
+    "compressed": ARTIFACT_SUFFIX,
+}
+
+_MAGIC = b"PHPZ1\n"
+_FOOTER = struct.Struct("<QI4s")
+_FOOTER_MAGIC = b"PHPZ"
+
+_CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+_PAGE_MARKER = re.compile(r'^=== 第 (\d+) 页 ===$')
+
+class PagedTextWriter:
+    """按页压缩写入文本产物的类文件对象。
+
+    文本按 "=== 第 N 页 ===" 标记行切分为页面，每页单独压缩后追加写入，
+    文件末尾写入页面偏移索引，读取时可以只解压需要的页面。
+    标记行之前的内容记为第 0 页。
+    """
+
+    def __init__(self, path, codec="zlib"):
+        """创建产物文件"""
+        if codec not in _CODECS:
+            raise ValueError(f"未知的压缩算法：{codec}，可选值：{', '.join(_CODECS)}")
+        self.path = Path(path)
+        self.codec = codec
+        self._compress = _CODECS[codec][0]
+        self._file = open(self.path, "wb")
+        self._file.write(_MAGIC)
+        self._pages = []
+        self._page_no = 0
+        self._segment = []
+        self._pending = ""
+
+    def write(self, text):
+        """写入文本，完整的行被归入当前页面"""
+        self._pending += text
+        lines = self._pending.split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._add_line(line + "\n")
+        return len(text)
+
+    def _add_line(self, line):
+        """追加一行，遇到页面标记行时先写出上一页"""
+        match = _PAGE_MARKER.match(line.rstrip("\n"))
+        if match:
+            self._flush_segment()
+            self._page_no = int(match.group(1))
+        self._segment.append(line)
+
+    def _flush_segment(self):
+        """压缩并写出当前页面"""
+        if not self._segment:
+            return
+        segment = "".join(self._segment)
+        data = self._compress(segment.encode("utf-8"))
+        self._pages.append([self._page_no, self._file.tell(), len(data), len(segment)])
+        self._file.write(data)
+        self._segment = []
+
+    def close(self):
+        """写出剩余内容和页面索引"""
+        if self._file.closed:
+            return
+        if self._pending:
+            self._segment.append(self._pending)
+            self._pending = ""
+        self._flush_segment()
+
+        index = json.dumps({"codec": self.codec, "pages": self._pages}).encode("utf-8")
+        index = zlib.compress(index)
+        index_offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(_FOOTER.pack(index_offset, len(index), _FOOTER_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+class PagedTextReader:
+    """按页随机读取压缩文本产物"""
+
+    def __init__(self, path):
+        """读取文件尾部的页面索引"""
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"不是压缩文本产物：{self.path}")
+            f.seek(-_FOOTER.size, 2)
+            index_offset, index_length, footer_magic = _FOOTER.unpack(f.read(_FOOTER.size))
+            if footer_magic != _FOOTER_MAGIC:
+                raise ValueError(f"压缩文本产物不完整：{self.path}")
+            f.seek(index_offset)
+            index = json.loads(zlib.decompress(f.read(index_length)).decode("utf-8"))
+
+        self.codec = index["codec"]
+        self._decompress = _CODECS[self.codec][1]
+        self._pages = index["pages"]
+        self._positions = {page_no: i for i, (page_no, _, _, _) in enumerate(self._pages)}
+
+    @property
+    def page_numbers(self):
+        """产物中包含的页码列表"""
+        return [page[0] for page in self._pages]
+
+    @property
+    def text_size(self):
+        """解压后的文本总字符数"""
+        return sum(page[3] for page in self._pages)
+
+    def _read_segment(self, f, position):
+        _, offset, length, _ = self._pages[position]
+        f.seek(offset)
+        return self._decompress(f.read(length)).decode("utf-8")
+
+    def read_page(self, page_no):
+        """读取指定页的正文（不含页面标记行），支持负数表示倒数第几页"""
+        if page_no < 0:
+            position = len(self._pages) + page_no
+        else:
+            position = self._positions[page_no]
+        with open(self.path, "rb") as f:
+            segment = self._read_segment(f, position)
+        lines = segment.split("\n", 1)
+        if _PAGE_MARKER.match(lines[0]):
+            segment = lines[1] if len(lines) > 1 else ""
+        return segment.rstrip("\n")
+
+    def iter_segments(self):
+        """按顺序逐页产出原始文本片段，拼接后与原文完全一致"""
+        with open(self.path, "rb") as f:
+            for position in range(len(self._pages)):
+                yield self._read_segment(f, position)
+
+    def read_text(self):
+        """解压并返回完整文本"""
+        return "".join(self.iter_segments())
+
+def is_paged_artifact(path):
+    """判断文件是否为压缩文本产物"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(_MAGIC)) == _MAGIC
+    except OSError:
+        return False
+
+def artifact_suffix(artifact_format="text"):
+    """根据产物格式获取文件后缀"""
+    if artifact_format not in ARTIFACT_FORMATS:
+        raise ValueError(f"未知的文本产物格式：{artifact_format}，可选值：{', '.join(ARTIFACT_FORMATS)}")
+    return ARTIFACT_FORMATS[artifact_format]
+
+def open_text_output(path, codec="zlib"):
+    """按文件后缀打开文本输出：.pz 写入压缩产物，其他后缀写入普通 UTF-8 文本"""
+    if Path(path).suffix == ARTIFACT_SUFFIX:
+        return PagedTextWriter(path, codec=codec)
+    return open(path, "w", encoding="utf-8")
+
+def read_text_artifact(path):
+    """读取完整文本，自动识别普通文本和压缩产物"""
+    if is_paged_artifact(path):
+        return PagedTextReader(path).read_text()
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def iter_text_lines(path, chunk_size=1024 * 1024):
+    """逐行读取文本（不含换行符），自动识别普通文本和压缩产物。
+    
+    产出的行与 text.split("\\n") 的结果一致，内存占用只与单行（压缩产物为单页）大小相关。
+    """
+    if is_paged_artifact(path):
+        chunks = PagedTextReader(path).iter_segments()
+    else:
+        def read_chunks():
+            with open(path, "r", encoding="utf-8") as f:
+                yield from iter(lambda: f.read(chunk_size), "")
+        chunks = read_chunks()
+
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        yield from lines
+    yield pending
+
+def copy_text_artifact(src, dst, codec="zlib", chunk_size=1024 * 1024):
+    """复制文本产物，源文件与目标后缀格式不同时边读边转换"""
+    src_paged = is_paged_artifact(src)
+    dst_paged = Path(dst).suffix == ARTIFACT_SUFFIX
+    if src_paged == dst_paged:
+        shutil.copyfile(src, dst)
+        return
+
+    with open_text_output(dst, codec=codec) as out:
+        if src_paged:
+            for segment in PagedTextReader(src).iter_segments():
+                out.write(segment)
+        else:
+            with open(src, "r", encoding="utf-8") as f:
+                for chunk in iter(lambda: f.read(chunk_size), ""):
+                    out.write(chunk)
@@ -0,0 +1,168 @@
+import os
+import time
+import multiprocessing
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.preprocessing.pdf_source import PdfSource
+from scripts.preprocessing.backends import get_backend
+
+# 提取子进程以 spawn 方式启动：批处理在工作线程中创建子进程，fork 会把其他线程当时持有的锁
+# （如 pdfium 调用锁、标准输出锁）原样复制到子进程，子进程可能永远等待这些锁
+MP_CONTEXT = multiprocessing.get_context("spawn")
+
+def _watchdog_worker(pdf_path, backend_name, conn):
+    """子进程：打开文档后循环接收页码并返回该页文本"""
+    try:
+        with PdfSource(pdf_path) as source:
+            document = get_backend(backend_name).open(source)
+            conn.send(("ready", document.page_count))
+            while True:
+                index = conn.recv()
+                if index is None:
+                    break
+                try:
+                    conn.send(("page", document.extract_page(index)))
+                except Exception as e:
+                    conn.send(("error", str(e)))
+    except Exception as e:
+        conn.send(("fatal", str(e)))
+    finally:
+        conn.close()
+
+class _SupervisedWorker:
+    """受监控的提取子进程，超时后可以被强制结束"""
+
+    def __init__(self, pdf_path, backend_name, startup_timeout):
+        self.conn, child_conn = MP_CONTEXT.Pipe()
+        self.process = MP_CONTEXT.Process(
+            target=_watchdog_worker,
+            args=(str(pdf_path), backend_name, child_conn),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        # 等待子进程打开文档
+        message = self._receive(startup_timeout)
+        if message is None:
+            self.kill()
+            raise TimeoutError(f"打开文档超时（>{startup_timeout} 秒）")
+        if message[0] == "fatal":
+            self.kill()
+            raise RuntimeError(message[1])
+
+    def _receive(self, timeout):
+        """在超时时间内接收一条消息，超时或子进程退出时返回 None"""
+        try:
+            if self.conn.poll(max(0, timeout)):
+                return self.conn.recv()
+        except (EOFError, OSError):
+            pass
+        return None
+
+    def submit(self, index):
+        """发送待提取的页码"""
+        self.conn.send(index)
+
+    def result(self, timeout):
+        """等待页面提取结果，返回 (文本, 错误信息)，超时返回 None"""
+        message = self._receive(timeout)
+        if message is None:
+            return None
+        kind, payload = message
+        if kind == "page":
+            return payload, None
+        return None, payload
+
+    def stop(self):
+        """正常结束子进程"""
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        """强制结束子进程"""
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.conn.close()
+
+def iter_pages_with_watchdog(pdf_path, total_pages, backend_name, page_timeout,
+                             workers=1, timeout=None):
+    """在受监控的子进程中逐页提取文本，单页超时时结束该子进程并跳过该页。
+
+    页面分批派发给 workers 个子进程，结果按页码顺序产出。卡住的页面被记为失败，
+    对应子进程会被重启，文档其余页面继续提取；子进程启动失败时同样只把该页记为失败。
+
+    Args:
+        pdf_path (str): PDF 文件路径
+        total_pages (int): 总页数
+        backend_name (str): 提取后端名称
+        page_timeout (float): 单页提取的时间预算（秒）
+        workers (int): 并行的子进程数
+        timeout (float): 整篇文档的时间预算（秒），超出后剩余页面直接记为失败
+
+    Yields:
+        tuple: (页码, 页面文本, 错误信息)，提取成功时错误信息为 None，失败时文本为 None
+    """
+    workers = max(1, min(int(workers or 1), total_pages or 1))
+    doc_deadline = time.monotonic() + timeout if timeout else None
+    pool = [None] * workers
+
+    try:
+        for wave_start in range(0, total_pages, workers):
+            wave = list(range(wave_start, min(wave_start + workers, total_pages)))
+
+            # 派发本批页面，必要时启动或重启子进程
+            dispatched = {}
+            failed = {}
+            for slot, index in enumerate(wave):
+                if doc_deadline and time.monotonic() >= doc_deadline:
+                    break
+                try:
+                    if pool[slot] is None:
+                        pool[slot] = _SupervisedWorker(pdf_path, backend_name, page_timeout)
+                    pool[slot].submit(index)
+                except Exception as e:
+                    if pool[slot] is not None:
+                        pool[slot].kill()
+                        pool[slot] = None
+                    failed[index] = f"提取子进程启动失败：{str(e)}"
+                    continue
+                dispatched[index] = (slot, time.monotonic() + page_timeout)
+
+            # 按页码顺序收集结果
+            for slot, index in enumerate(wave):
+                if index in failed:
+                    yield index + 1, None, failed[index]
+                    continue
+                if index not in dispatched:
+                    yield index + 1, None, "超出任务时间预算，已跳过"
+                    continue
+
+                _, deadline = dispatched[index]
+                if doc_deadline:
+                    deadline = min(deadline, doc_deadline)
+                outcome = pool[slot].result(deadline - time.monotonic())
+                if outcome is None:
+                    pool[slot].kill()
+                    pool[slot] = None
+                    if doc_deadline and time.monotonic() >= doc_deadline:
+                        yield index + 1, None, "超出任务时间预算，已跳过"
+                    else:
+                        yield index + 1, None, f"提取超时（>{page_timeout} 秒）"
+                else:
+                    text, error = outcome
+                    yield index + 1, text, error
+    finally:
+        for worker in pool:
+            if worker is not None:
+                worker.stop()
@@ -0,0 +1,82 @@
+import io
+import os
+import mmap
+from pathlib import Path
+
+class _MappedReader(io.RawIOBase):
+    """映射缓冲区上的只读类文件对象，独立维护读取位置，按需复制请求的数据块"""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._buffer[self._pos:self._pos + len(b)]
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._buffer)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+class PdfSource:
+    """以内存映射方式打开的 PDF 文件。
+
+    文件只打开一次，验证、哈希和文本提取共享同一个只读映射，
+    实际读取由操作系统页缓存按需完成，不会把整个文件复制到进程内存。
+    """
+
+    def __init__(self, path):
+        """打开文件并建立只读内存映射"""
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            # 打开时的文件状态，与映射内容属于同一时刻，可与内容哈希一起作为文件指纹
+            self.stat = os.fstat(self._file.fileno())
+            self.size = self.stat.st_size
+            # 空文件无法建立映射，使用空缓冲区代替
+            if self.size > 0:
+                self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.buffer = b""
+        except Exception:
+            self._file.close()
+            raise
+
+    def stream(self):
+        """返回可直接交给 PdfReader 的类文件对象"""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.seek(0)
+            return self.buffer
+        return io.BytesIO(self.buffer)
+
+    def reader(self):
+        """返回独立的只读类文件对象，供需要 readinto 接口的原生库（如 pdfium）按块读取映射"""
+        return _MappedReader(self.buffer)
+
+    def close(self):
+        """关闭映射和文件"""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -1,77 +1,254 @@
 import os
 import re
+import json
 from pathlib import Path
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-def preprocess_text(input_file):
-    """预处理提取的文本内容"""
+from scripts.preprocessing.page_store import iter_text_lines, open_text_output
+
+# 可能包含代码的行的特征（包含特定关键字或模式）
+CODE_KEYWORDS = [
+    r'import\s+\w+',
+    r'def\s+\w+\s*\(',
+    r'class\s+\w+',
+    r'return\s+',
+    r'for\s+\w+\s+in\s+',
+    r'if\s+.*:',
+    r'while\s+.*:',
+    r'print\s*\(',
+    r'=\s*\w+\(',
+    r'\.py$'
+]
+
+# 所有关键字编译为一个交替模式，每行只需匹配一次
+_CODE_PATTERN = re.compile("|".join(f"(?:{keyword})" for keyword in CODE_KEYWORDS))
+_SPACES = re.compile(r'[ \t]+')
+_PAGE_MARKER = re.compile(r'^=== 第 (\d+) 页 ===$')
+URL_PATTERN = re.compile(r'https?://[^\s<>"\)]+|www\.[^\s<>"\)]+')
+# 章节标题：编号标题（如 "3.1 Method"、"IV. Experiments"）或独占一行的常见章节名
+_HEADING = re.compile(
+    r'^(?:(?:\d+(?:\.\d+)*\.?|[IVX]+\.)\s+[A-Z][^.!?]{0,80}'
+    r'|(?:Abstract|Introduction|Related Work|Background|Methods?|Methodology|Experiments?'
+    r'|Results|Discussion|Conclusions?|References|Acknowledge?ments?)\s*)$'
+)
+
+# 单个 str.translate 表完成 Unicode 规范化：展开连字，统一不间断空格，删除软连字符和零宽字符
+_TRANSLATION = str.maketrans({
+    "\ufb00": "ff",
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+    "\ufb05": "st",
+    "\ufb06": "st",
+    "\xa0": " ",
+    "\u202f": " ",
+    "\u2007": " ",
+    "\xad": None,
+    "\u200b": None,
+    "\ufeff": None,
+})
+
+def find_urls(text, pos=0, endpos=None):
+    """扫描文本中的链接，逐个产出 (起点, 终点)，终点去掉链接末尾的句读标点"""
+    if endpos is None:
+        endpos = len(text)
+    for match in URL_PATTERN.finditer(text, pos, endpos):
+        yield match.start(), match.start() + len(match.group().rstrip(".,;:"))
+
+def iter_preprocessed_lines(lines):
+    """逐行预处理文本，每行只处理一次
+    
+    依次规范化 Unicode 字符、合并连续空白、将连续多个空行压缩为一个空行，
+    并判断该行是否可能包含代码。
+    
+    Args:
+        lines (iterable): 不含换行符的文本行
+    
+    Yields:
+        tuple: (处理后的文本行, 是否为代码行)
+    """
+    previous_blank = False
+    for line in lines:
+        line = _SPACES.sub(' ', line.translate(_TRANSLATION))
+        
+        if not line:
+            if previous_blank:
+                continue
+            previous_blank = True
+            yield line, False
+            continue
+        previous_blank = False
+        
+        yield line, bool(_CODE_PATTERN.search(line))
+
+class SpanCollector:
+    """在逐行写出预处理文本的同时记录各类区间的字符偏移
+    
+    区间类型：code（连续的代码行合并为一个区间）、url、heading、page（[页码, 起点, 终点]）。
+    """
+    
+    def __init__(self):
+        self.spans = {"code": [], "url": [], "heading": [], "page": []}
+    
+    def add_line(self, line, start, is_code):
+        """记录一行文本的区间，start 为该行在输出文本中的起始偏移"""
+        end = start + len(line)
+        pages = self.spans["page"]
+        
+        marker = _PAGE_MARKER.match(line)
+        if marker:
+            pages.append([int(marker.group(1)), start, end])
+            return
+        if pages:
+            pages[-1][2] = end
+        if not line:
+            return
+        
+        if is_code:
+            code = self.spans["code"]
+            # 与上一代码行相邻（中间只有换行符）时合并为一个代码块
+            if code and code[-1][1] == start - 1:
+                code[-1][1] = end
+            else:
+                code.append([start, end])
+        elif _HEADING.match(line):
+            self.spans["heading"].append([start, end])
+        
+        for url_start, url_end in find_urls(line):
+            self.spans["url"].append([start + url_start, start + url_end])
+
+# 区间文件格式版本，区间的含义或格式变化时需要递增，使旧的区间文件失效
+SPANS_VERSION = 1
+
+def spans_file_for(text_file):
+    """预处理文本对应的区间文件路径，保留文本文件的完整文件名，避免 x.txt 与 x.pz 的区间文件重名"""
+    path = Path(text_file)
+    return path.with_name(path.name + ".spans.json")
+
+def load_spans(text_file, text_size=None):
+    """读取预处理文本的区间文件
+    
+    Args:
+        text_file (str): 预处理文本文件路径
+        text_size (int): 已读取文本的长度，提供时检查区间文件是否对应同一份文本
+    
+    Returns:
+        dict: 各类区间，区间文件不存在、无法读取、版本不符或与文本长度不一致时返回 None
+    """
+    spans_file = spans_file_for(text_file)
+    if not spans_file.exists():
+        return None
     try:
-        # 读取原始文本
-        with open(input_file, "r", encoding="utf-8") as f:
-            text = f.read()
-            
-        # 1. 清理特殊字符
-        # 保留换行符，但删除连续的空白字符
-        text = re.sub(r'[ \t]+', ' ', text)
-        # 删除连续的换行符
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        with open(spans_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SPANS_VERSION:
+            print(f"区间文件版本不符，忽略：{spans_file}")
+            return None
+        if text_size is not None and data.get("text_size") != text_size:
+            print(f"区间文件与预处理文本不一致，忽略：{spans_file}")
+            return None
+        return data["spans"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"读取区间文件时出错，忽略：{str(e)}")
+        return None
+
+def iter_page_lines(pages):
+    """将 (页码, 页面文本) 序列展开为与提取文本文件相同格式的文本行，用于直接衔接提取输出"""
+    for page_no, text in pages:
+        yield f"=== 第 {page_no} 页 ==="
+        yield from (text or "").split("\n")
+        yield ""
+
+def _write_preprocessed_lines(lines, source, output_file, report_file, codec):
+    """逐行预处理并立即写入输出文件，同时写出区间文件，最后生成预处理报告"""
+    collector = SpanCollector()
+    text_size = 0
+    
+    # 单遍处理所有行：规范化字符、清理空白、识别代码行，处理完一行写出一行
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open_text_output(output_file, codec=codec) as f:
+        for i, (line, is_code) in enumerate(iter_preprocessed_lines(lines)):
+            if i:
+                f.write("\n")
+                text_size += 1
+            collector.add_line(line, text_size, is_code)
+            f.write(line)
+            text_size += len(line)
+    
+    # 区间以紧凑的 JSON 保存在预处理文本旁
+    spans = collector.spans
+    spans_file = spans_file_for(output_file)
+    with open(spans_file, "w", encoding="utf-8") as f:
+        json.dump({"version": SPANS_VERSION, "text_size": text_size, "spans": spans}, f, separators=(",", ":"))
         
-        # 2. 标记可能的代码块
-        # 寻找可能包含代码的段落（包含特定关键字或模式）
-        code_keywords = [
-            r'import\s+\w+',
-            r'def\s+\w+\s*\(',
-            r'class\s+\w+',
-            r'return\s+',
-            r'for\s+\w+\s+in\s+',
-            r'if\s+.*:',
-            r'while\s+.*:',
-            r'print\s*\(',
-            r'=\s*\w+\(',
-            r'\.py$'
-        ]
+    print(f"\n文本预处理完成！")
+    print(f"输出文件：{output_file}")
+    print(f"区间文件：{spans_file}")
+    print(f"文本大小：{text_size / 1024:.2f} KB")
+    
+    # 生成预处理报告
+    report_path = Path(report_file)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("# 文本预处理报告\n\n")
+        f.write("## 处理信息\n")
+        f.write(f"- 源文件：{source}\n")
+        f.write(f"- 输出文件：{output_file}\n")
+        f.write(f"- 区间文件：{spans_file}\n")
+        f.write(f"- 文本大小：{text_size / 1024:.2f} KB\n")
+        f.write(f"- 检测到的代码块数量：{len(spans['code'])}\n")
+        f.write(f"- 检测到的链接数量：{len(spans['url'])}\n")
+        f.write(f"- 检测到的章节标题数量：{len(spans['heading'])}\n")
         
-        # 用特殊标记包围可能的代码块
-        for keyword in code_keywords:
-            text = re.sub(
-                f'([^\n]*{keyword}[^\n]*)',
-                r'[CODE_BLOCK_START]\1[CODE_BLOCK_END]',
-                text
-            )
+        f.write("\n## 预处理步骤\n")
+        f.write("1. 规范化 Unicode 字符（连字、不间断空格、软连字符）\n")
+        f.write("2. 规范化空白字符\n")
+        f.write("3. 识别代码行、链接和章节标题，记录到区间文件\n")
         
-        # 3. 保存处理后的文本
-        output_dir = Path("output/analysis/text")
-        output_file = output_dir / "preprocessed_text.txt"
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(text)
-            
-        print(f"\n文本预处理完成！")
-        print(f"输出文件：{output_file}")
-        print(f"文本大小：{len(text) / 1024:.2f} KB")
+        f.write("\n## 处理结果\n")
+        f.write("- ✓ 文本预处理成功\n")
+
+def preprocess_text(input_file,
+                    output_file="output/analysis/text/preprocessed_text.txt",
+                    report_file="output/analysis/report/preprocessing_result.md",
+                    codec="zlib"):
+    """预处理提取的文本内容，逐行读取、逐行写出，内存占用与文档大小无关
+    
+    Args:
+        input_file (str): 提取文本文件路径，支持普通文本和压缩文本产物
+        output_file (str): 预处理文本的输出文件路径
+        report_file (str): 预处理报告的输出文件路径
+        codec (str): 输出文件后缀为 .pz 时使用的压缩算法
+    """
+    try:
+        _write_preprocessed_lines(iter_text_lines(input_file), input_file,
+                                  output_file, report_file, codec)
+        return True
         
-        # 生成预处理报告
-        report_path = Path("output/analysis/report/preprocessing_result.md")
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write("# 文本预处理报告\n\n")
-            f.write("## 处理信息\n")
-            f.write(f"- 源文件：{input_file}\n")
-            f.write(f"- 输出文件：{output_file}\n")
-            f.write(f"- 文本大小：{len(text) / 1024:.2f} KB\n")
-            
-            # 统计可能的代码块数量
-            code_blocks = len(re.findall(r'\[CODE_BLOCK_START\].*?\[CODE_BLOCK_END\]', text, re.DOTALL))
-            f.write(f"- 检测到的代码块数量：{code_blocks}\n")
-            
-            f.write("\n## 预处理步骤\n")
-            f.write("1. 清理特殊字符\n")
-            f.write("2. 规范化空白字符\n")
-            f.write("3. 标记可能的代码块\n")
-            
-            f.write("\n## 处理结果\n")
-            f.write("- ✓ 文本预处理成功\n")
-            
+    except Exception as e:
+        print(f"文本预处理过程中出错: {str(e)}")
+        return False
+
+def preprocess_pages(pages, source,
+                     output_file="output/analysis/text/preprocessed_text.txt",
+                     report_file="output/analysis/report/preprocessing_result.md",
+                     codec="zlib"):
+    """直接预处理逐页产出的文本（如 iter_page_texts 的输出），不经过中间文件
+    
+    Args:
+        pages (iterable): (页码, 页面文本) 元组序列
+        source (str): 文本来源，写入预处理报告
+        output_file (str): 预处理文本的输出文件路径
+        report_file (str): 预处理报告的输出文件路径
+        codec (str): 输出文件后缀为 .pz 时使用的压缩算法
+    """
+    try:
+        _write_preprocessed_lines(iter_page_lines(pages), source,
+                                  output_file, report_file, codec)
         return True
         
     except Exception as e:
@@ -1,54 +1,85 @@
 import os
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-def validate_pdf(file_path):
-    """验证 PDF 文件是否存在且可读"""
-    try:
-        # 使用 Path 对象处理路径
-        path = Path(file_path)
-        directory = path.parent
-        target_filename = path.name
+try:
+    import magic
+except ImportError:
+    magic = None
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.preprocessing.directory_index import get_directory_index
+from scripts.preprocessing.pdf_source import PdfSource
+
+def resolve_pdf_path(file_path):
+    """查找磁盘上与给定路径匹配的实际文件（忽略不可见字符和空格差异）
+    
+    Returns:
+        Path: 实际文件路径，找不到时返回 None
+    """
+    # 使用 Path 对象处理路径
+    path = Path(file_path)
+    directory = path.parent
+    target_filename = path.name
+    
+    # 检查目录是否存在
+    if not directory.exists():
+        print(f"目录不存在: {directory}")
+        return None
         
-        # 检查目录是否存在
-        if not directory.exists():
-            print(f"目录不存在: {directory}")
-            return False
-            
-        # 查找匹配的文件（忽略不可见字符和空格差异）
-        actual_filename = None
-        for filename in os.listdir(directory):
-            # 规范化文件名：移除不可见字符，统一空格
-            normalized_filename = filename.replace('\xa0', ' ').strip()
-            normalized_target = target_filename.replace('\xa0', ' ').strip()
-            
-            if normalized_filename == normalized_target:
-                actual_filename = filename
-                break
+    # 通过缓存的目录索引查找匹配的文件（忽略不可见字符和空格差异）
+    actual_filename = get_directory_index().lookup(directory, target_filename)
+    
+    if actual_filename is None:
+        print(f"找不到匹配的文件: {target_filename}")
+        return None
         
-        if actual_filename is None:
-            print(f"找不到匹配的文件: {target_filename}")
-            return False
+    return directory / actual_filename
+
+def validate_pdf(file_path, source=None):
+    """验证 PDF 文件是否存在且可读
+    
+    Args:
+        file_path (str): PDF 文件路径
+        source (PdfSource): 已打开的文件映射。提供时直接复用该映射进行验证，
+            不再重复查找、统计和打开文件
+    
+    Returns:
+        Path: 验证通过的实际文件路径，验证失败时返回 False
+    """
+    try:
+        if source is not None:
+            # 映射建立成功即说明文件存在且可读
+            path = source.path
+            print(f"正在验证文件: {path}")
+            size_bytes = source.size
+        else:
+            path = resolve_pdf_path(file_path)
+            if path is None:
+                return False
+            print(f"正在验证文件: {path}")
             
-        path = directory / actual_filename
-        print(f"正在验证文件: {path}")
-        
-        if not path.exists():
-            print(f"文件不存在: {path}")
-            return False
-        
-        if not path.is_file():
-            print("路径不是一个文件")
-            return False
+            if not path.exists():
+                print(f"文件不存在: {path}")
+                return False
             
-        if not os.access(str(path), os.R_OK):
-            print("文件不可读")
-            return False
+            if not path.is_file():
+                print("路径不是一个文件")
+                return False
+                
+            if not os.access(str(path), os.R_OK):
+                print("文件不可读")
+                return False
+                
+            size_bytes = path.stat().st_size
             
         if path.suffix.lower() != '.pdf':
             print("文件不是 PDF 格式")
             return False
             
-        file_size = path.stat().st_size / 1024 / 1024  # 转换为 MB
+        file_size = size_bytes / 1024 / 1024  # 转换为 MB
         print(f"文件验证成功：")
         print(f"- 路径: {path}")
         print(f"- 大小: {file_size:.2f} MB")
@@ -58,6 +89,87 @@ def validate_pdf(file_path):
         print(f"验证过程中出现错误: {str(e)}")
         return False
 
+def open_validated_pdf(file_path):
+    """查找实际文件，以内存映射方式打开并验证，验证与后续提取共享同一个映射
+    
+    Args:
+        file_path (str): PDF 文件路径
+    
+    Returns:
+        PdfSource: 验证通过的文件映射，由调用方关闭；找不到文件或验证失败时返回 None
+    """
+    path = resolve_pdf_path(file_path)
+    if path is None:
+        return None
+    try:
+        source = PdfSource(path)
+    except OSError as e:
+        print(f"文件不可读：{str(e)}")
+        return None
+    if not validate_pdf(path, source=source):
+        source.close()
+        return None
+    return source
+
+def sniff_pdf(file_path, head_size=1024, tail_size=2048):
+    """只读取文件头尾字节，检查 PDF 文件头和结束标记
+    
+    Args:
+        file_path (str): PDF 文件路径
+        head_size (int): 读取的文件头字节数，%PDF- 标记允许出现在前 1024 字节内
+            （与 PDF 阅读器和提取器的容错一致）；标记位于文件开头时再用 libmagic 检测文件类型
+        tail_size (int): 读取的文件尾字节数
+    
+    Returns:
+        str: 文件有问题时返回原因，检查通过时返回 None
+    """
+    path = Path(file_path)
+    if path.suffix.lower() != '.pdf':
+        return "文件不是 PDF 格式"
+    
+    try:
+        size = path.stat().st_size
+        if size == 0:
+            return "文件为空"
+        with open(path, "rb") as f:
+            head = f.read(head_size)
+            f.seek(max(0, size - tail_size))
+            tail = f.read(tail_size)
+    except OSError as e:
+        return f"文件不可读：{str(e)}"
+    
+    header = head.find(b"%PDF-")
+    if header < 0:
+        return "缺少 %PDF- 文件头"
+    # libmagic 只识别位于偏移 0 的文件头，文件头前有多余字节（如换行、BOM）时不做类型检测
+    if magic is not None and header == 0:
+        mime = magic.from_buffer(head, mime=True)
+        if mime != "application/pdf":
+            return f"文件类型为 {mime}，不是 PDF"
+    if b"%%EOF" not in tail:
+        return "缺少 %%EOF 结束标记，文件可能被截断"
+    if b"startxref" not in tail:
+        return "缺少 startxref 交叉引用表位置"
+    return None
+
+def validate_pdfs(file_paths, workers=8):
+    """并行检查一批 PDF 文件的文件头和结束标记，用于在排队前剔除损坏的文件
+    
+    Args:
+        file_paths (list): PDF 文件路径列表
+        workers (int): 并行检查的线程数
+    
+    Returns:
+        tuple: (通过检查的路径列表, [(未通过的路径, 原因), ...])，均保持输入顺序
+    """
+    file_paths = list(file_paths)
+    with ThreadPoolExecutor(max_workers=max(1, int(workers or 1))) as executor:
+        reasons = list(executor.map(sniff_pdf, file_paths))
+    
+    valid = [path for path, reason in zip(file_paths, reasons) if reason is None]
+    rejected = [(path, reason) for path, reason in zip(file_paths, reasons) if reason is not None]
+    return valid, rejected
+
 if __name__ == "__main__":
     # 测试不同类型的文件名
     test_files = [
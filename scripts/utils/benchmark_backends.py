@@ -0,0 +1,129 @@
+import os
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.preprocessing.pdf_source import PdfSource
+from scripts.preprocessing.backends import BACKENDS, available_backends
+
+def benchmark_backend(backend_name, pdf_files, max_pages=None):
+    """在给定的 PDF 文件上测量单个提取后端的速度
+
+    Args:
+        backend_name (str): 后端名称
+        pdf_files (list): PDF 文件路径列表
+        max_pages (int): 每个文件最多提取的页数，None 表示全部页面
+
+    Returns:
+        dict: 文件数、页数、字符数、耗时和吞吐量统计
+    """
+    backend = BACKENDS[backend_name]()
+    stats = {
+        "backend": backend_name,
+        "version": backend.version,
+        "files": 0,
+        "failed_files": 0,
+        "pages": 0,
+        "chars": 0,
+        "seconds": 0.0
+    }
+
+    for pdf_file in pdf_files:
+        start = time.perf_counter()
+        try:
+            with PdfSource(pdf_file) as source:
+                document = backend.open(source)
+                total_pages = document.page_count
+                if max_pages:
+                    total_pages = min(total_pages, max_pages)
+                for i in range(total_pages):
+                    stats["chars"] += len(document.extract_page(i) or "")
+                    stats["pages"] += 1
+            stats["files"] += 1
+        except Exception as e:
+            print(f"[{backend_name}] 处理 {pdf_file} 时出错：{str(e)}")
+            stats["failed_files"] += 1
+        stats["seconds"] += time.perf_counter() - start
+
+    seconds = stats["seconds"] or 1e-9
+    stats["pages_per_sec"] = stats["pages"] / seconds
+    stats["chars_per_sec"] = stats["chars"] / seconds
+    return stats
+
+def generate_benchmark_report(corpus_dir, results, output_file):
+    """生成后端速度对比报告"""
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    report = [
+        "# 提取后端速度对比报告",
+        f"\n生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"\n- 测试语料：{corpus_dir}",
+        "\n| 后端 | 版本 | 文件数 | 失败数 | 页数 | 字符数 | 耗时（秒） | 页/秒 | 字符/秒 |",
+        "| --- | --- | --- | --- | --- | --- | --- | --- | --- |"
+    ]
+    for r in sorted(results, key=lambda x: x["pages_per_sec"], reverse=True):
+        report.append(
+            f"| {r['backend']} | {r['version']} | {r['files']} | {r['failed_files']} | {r['pages']} | "
+            f"{r['chars']} | {r['seconds']:.2f} | {r['pages_per_sec']:.1f} | {r['chars_per_sec']:.0f} |"
+        )
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(report) + "\n")
+    return output_file
+
+def run_benchmark(corpus_dir, backends=None, max_pages=None,
+                  output_file="output/analysis/report/backend_benchmark.md"):
+    """对本地语料运行各提取后端的速度对比
+
+    Args:
+        corpus_dir (str): PDF 语料目录
+        backends (list): 参与对比的后端名称，None 表示所有已安装的后端
+        max_pages (int): 每个文件最多提取的页数
+        output_file (str): 报告输出路径
+
+    Returns:
+        list: 各后端的统计结果，失败时返回 None
+    """
+    try:
+        pdf_files = sorted(Path(corpus_dir).glob("*.pdf"))
+        if not pdf_files:
+            print(f"未找到PDF文件：{corpus_dir}")
+            return None
+
+        backends = backends or available_backends()
+        print(f"测试语料：{len(pdf_files)} 个PDF文件")
+        print(f"参与对比的后端：{', '.join(backends)}")
+
+        results = []
+        for name in backends:
+            if name not in BACKENDS or not BACKENDS[name].is_available():
+                print(f"跳过未安装的后端：{name}")
+                continue
+            print(f"\n正在测试后端：{name}")
+            stats = benchmark_backend(name, pdf_files, max_pages=max_pages)
+            print(f"- 页数：{stats['pages']}，耗时：{stats['seconds']:.2f} 秒")
+            print(f"- 速度：{stats['pages_per_sec']:.1f} 页/秒，{stats['chars_per_sec']:.0f} 字符/秒")
+            results.append(stats)
+
+        report_file = generate_benchmark_report(corpus_dir, results, output_file)
+        print(f"\n报告文件：{report_file}")
+        return results
+
+    except Exception as e:
+        print(f"运行后端速度对比时出错：{str(e)}")
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="对比各 PDF 文本提取后端的速度")
+    parser.add_argument("corpus_dir", nargs="?", default="data/test", help="PDF 语料目录")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), help="参与对比的后端")
+    parser.add_argument("--max-pages", type=int, default=None, help="每个文件最多提取的页数")
+    parser.add_argument("--output", default="output/analysis/report/backend_benchmark.md", help="报告输出路径")
+    args = parser.parse_args()
+
+    run_benchmark(args.corpus_dir, backends=args.backends, max_pages=args.max_pages, output_file=args.output)
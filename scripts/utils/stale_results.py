@@ -0,0 +1,128 @@
+import os
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from scripts.analysis.rule_set import get_rule_set
+from scripts.batch.fingerprints import FingerprintStore, FINGERPRINT_FILE
+from scripts.batch.workspace import WORKSPACE_ROOT
+
+def find_stale_results(rule_set, workspace_dir=WORKSPACE_ROOT, fingerprint_file=FINGERPRINT_FILE):
+    """查找不是由当前规则产生的分析结果
+
+    同时检查增量批处理的指纹记录（会被沿用的结果）和各论文工作目录中的分析结果文件。
+
+    Args:
+        rule_set (CompiledRuleSet): 当前规则
+        workspace_dir (str): 论文工作目录根路径
+        fingerprint_file (str): 指纹记录文件
+
+    Returns:
+        list: 过期结果列表，每项包含论文ID、来源和产生该结果的规则标识
+    """
+    stale = {}
+
+    store = FingerprintStore(fingerprint_file)
+    for paper_id, entry in store.entries.items():
+        analysis_results = entry.get("result", {}).get("analysis_results")
+        if not rule_set.is_current(analysis_results):
+            stale[paper_id] = {
+                "paper_id": paper_id,
+                "source": str(fingerprint_file),
+                "rules": (analysis_results or {}).get("rules")
+            }
+
+    for results_file in sorted(Path(workspace_dir).glob("*/report/analysis_results.json")):
+        paper_id = results_file.parent.parent.name
+        try:
+            with open(results_file, "r", encoding="utf-8") as f:
+                analysis_results = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取分析结果时出错：{results_file}（{str(e)}）")
+            continue
+        if not rule_set.is_current(analysis_results) and paper_id not in stale:
+            stale[paper_id] = {
+                "paper_id": paper_id,
+                "source": str(results_file),
+                "rules": analysis_results.get("rules")
+            }
+
+    return sorted(stale.values(), key=lambda x: x["paper_id"])
+
+def requeue_stale_results(stale, fingerprint_file=FINGERPRINT_FILE):
+    """删除过期结果的指纹记录，下次增量批处理时这些论文会被重新分析"""
+    store = FingerprintStore(fingerprint_file)
+    count = 0
+    for item in stale:
+        if item["paper_id"] in store.entries:
+            store.forget(item["paper_id"])
+            count += 1
+    store.save()
+    return count
+
+def generate_stale_report(rule_set, stale, output_file):
+    """生成过期结果报告"""
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    report = [
+        "# 过期分析结果报告",
+        f"\n生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"\n- 当前规则版本：{rule_set.version}",
+        f"- 当前规则哈希：{rule_set.content_hash}",
+        f"- 过期结果数：{len(stale)}",
+        "\n| 论文ID | 规则版本 | 规则哈希 | 来源 |",
+        "| --- | --- | --- | --- |"
+    ]
+    for item in stale:
+        rules = item["rules"] or {}
+        report.append(f"| {item['paper_id']} | {rules.get('version', '无')} | {rules.get('hash', '无')} | {item['source']} |")
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(report) + "\n")
+    return output_file
+
+def check_stale_results(rules_file=None, workspace_dir=WORKSPACE_ROOT, fingerprint_file=FINGERPRINT_FILE,
+                        requeue=False, output_file="output/analysis/report/stale_results.md"):
+    """列出过期的分析结果，可选地将其重新加入下次批处理
+
+    Returns:
+        list: 过期结果列表，失败时返回 None
+    """
+    try:
+        rule_set = get_rule_set(rules_file)
+        print(f"当前分析规则：版本 {rule_set.version}，哈希 {rule_set.content_hash}")
+
+        stale = find_stale_results(rule_set, workspace_dir, fingerprint_file)
+        print(f"过期结果：{len(stale)} 个")
+        for item in stale:
+            rules = item["rules"] or {}
+            print(f"- {item['paper_id']}（规则版本 {rules.get('version', '无')}）")
+
+        if requeue and stale:
+            count = requeue_stale_results(stale, fingerprint_file)
+            print(f"已重新排队 {count} 篇论文，下次批处理时重新分析")
+
+        report_file = generate_stale_report(rule_set, stale, output_file)
+        print(f"\n报告文件：{report_file}")
+        return stale
+
+    except Exception as e:
+        print(f"检查过期结果时出错：{str(e)}")
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="列出由旧版分析规则产生的结果，并可将其重新排队")
+    parser.add_argument("--rules-file", default=None, help="当前规则文件，默认使用 config/rules/default.yaml")
+    parser.add_argument("--workspace-dir", default=WORKSPACE_ROOT, help="论文工作目录根路径")
+    parser.add_argument("--fingerprint-file", default=FINGERPRINT_FILE, help="增量批处理的指纹记录文件")
+    parser.add_argument("--requeue", action="store_true", help="删除过期结果的指纹记录，下次批处理时重新分析")
+    parser.add_argument("--output", default="output/analysis/report/stale_results.md", help="报告输出路径")
+    args = parser.parse_args()
+
+    check_stale_results(args.rules_file, args.workspace_dir, args.fingerprint_file,
+                        requeue=args.requeue, output_file=args.output)
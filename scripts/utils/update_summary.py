@@ -35,6 +35,37 @@ def load_analysis_results():
     
     return results
 
+def merge_scanned_papers(analysis_results, scanned_papers):
+    """将快速扫描得到的论文信息补充到分析结果中，已有分析结果的论文保持不变"""
+    known_titles = {
+        normalize_title(r.get("paper_info", {}).get("title", ""))
+        for r in analysis_results if isinstance(r, dict)
+    }
+    
+    for paper in scanned_papers or []:
+        title = normalize_title(paper["file_name"])
+        if title in known_titles:
+            continue
+        analysis_results.append({
+            "paper_info": {
+                "title": title,
+                "file_size": paper.get("file_size", 0),
+                "page_count": paper.get("page_count")
+            },
+            "steps": [],
+            "status": "scanned",
+            "analysis_result": {
+                "paper_info": {
+                    "title": paper.get("title"),
+                    "authors": paper.get("authors", []),
+                    "institutions": paper.get("institutions", [])
+                }
+            }
+        })
+        known_titles.add(title)
+    
+    return analysis_results
+
 def normalize_spaces(lines):
     # 规范化空行：确保段落之间只有一个空行
     normalized = []
@@ -201,12 +232,17 @@ def format_update_record(record):
     # 组合格式化后的记录
     return header + "\n" + "\n".join(formatted_content)
 
-def update_paper_summary():
+def update_paper_summary(scanned_papers=None):
+    """更新论文汇总文件
+    
+    Args:
+        scanned_papers (list): 快速扫描得到的论文信息，用于补充尚未分析的论文
+    """
     # 加载分析结果
-    analysis_results = load_analysis_results()
+    analysis_results = merge_scanned_papers(load_analysis_results(), scanned_papers)
     if not analysis_results:
         print("未找到分析结果！")
-        return
+        return False
     
     # 读取现有的汇总文件
     summary_file = "output/paper_summary.md"
@@ -293,6 +329,9 @@ def update_paper_summary():
 - 作者：{author_info['authors']}
 - 机构：{author_info['institutions']}"""
 
+        if paper_info.get('page_count'):
+            paper_section += f"\n- 页数：{paper_info['page_count']}"
+
         paper_section += f"""
 
 #### 代码实现
@@ -360,6 +399,7 @@ def update_paper_summary():
         f.write("\n".join(normalize_spaces(new_content)))
     
     print("汇总文件更新完成！")
+    return True
 
 if __name__ == "__main__":
     update_paper_summary() 
\ No newline at end of file
@@ -4,8 +4,11 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from pathlib import Path
 from datetime import datetime
+import re
 import yaml
 from scripts.utils.update_summary import update_paper_summary
+from scripts.preprocessing.extract_text import extract_front_matter
+from scripts.analysis.analyze_paper import extract_paper_info
 
 def load_config():
     """加载配置文件"""
@@ -21,8 +24,35 @@ def load_config():
         print(f"加载配置文件时出错：{str(e)}")
         return None
 
-def scan_papers():
-    """扫描论文目录，获取基本信息"""
+def scan_front_matter(pdf_file, max_pages=2):
+    """快速扫描论文：只读取文档信息字典和前几页，提取标题、作者、机构和页数"""
+    front = extract_front_matter(pdf_file, max_pages=max_pages)
+    info = extract_paper_info(front["text"])
+    metadata = front["metadata"]
+    
+    # 正文中识别出的标题优先，文档信息中的标题常为排版软件生成的文件名
+    title = info["title"] or metadata.get("title")
+    authors = info["authors"]
+    if metadata.get("author"):
+        authors = [a.strip() for a in re.split(r'[,;]|\band\b', metadata["author"]) if a.strip()]
+    
+    return {
+        "title": title,
+        "authors": authors,
+        "institutions": info["institutions"],
+        "page_count": front["page_count"]
+    }
+
+def scan_papers(fast=True, max_pages=2):
+    """扫描论文目录，获取基本信息
+    
+    Args:
+        fast (bool): 是否启用快速扫描，只读取每篇论文的前几页获取标题、作者和机构
+        max_pages (int): 快速扫描时读取的最大页数
+    
+    Returns:
+        list: 论文信息列表，扫描失败时返回 False
+    """
     try:
         # 加载配置
         config = load_config()
@@ -34,12 +64,13 @@ def scan_papers():
             print(f"论文目录不存在：{papers_dir}")
             return False
             
-        pdf_files = list(papers_dir.glob("*.pdf"))
+        pdf_files = sorted(papers_dir.glob("*.pdf"))
         if not pdf_files:
             print("未找到PDF文件！")
             return False
             
         print(f"\n找到 {len(pdf_files)} 个PDF文件：")
+        papers = []
         for pdf_file in pdf_files:
             size_mb = pdf_file.stat().st_size / (1024 * 1024)
             mod_time = datetime.fromtimestamp(pdf_file.stat().st_mtime)
@@ -47,17 +78,34 @@ def scan_papers():
             print(f"  大小：{size_mb:.2f}MB")
             print(f"  修改时间：{mod_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
-        return True
+            paper = {
+                "file_name": pdf_file.name,
+                "pdf_path": str(pdf_file),
+                "file_size": size_mb,
+                "last_modified": mod_time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+            
+            if fast:
+                try:
+                    paper.update(scan_front_matter(pdf_file, max_pages=max_pages))
+                    print(f"  页数：{paper['page_count']}")
+                    print(f"  标题：{paper['title'] or '未识别'}")
+                except Exception as e:
+                    print(f"  快速扫描失败：{str(e)}")
+                    
+            papers.append(paper)
+            
+        return papers
         
     except Exception as e:
         print(f"扫描论文目录时出错：{str(e)}")
         return False
 
-def generate_summary():
+def generate_summary(papers=None):
     """生成论文汇总文档"""
     try:
         # 调用更新汇总文件的函数
-        update_paper_summary()
+        update_paper_summary(scanned_papers=papers)
         return True
         
     except Exception as e:
@@ -69,17 +117,18 @@ def main():
     print("开始执行工作流2：论文信息汇总...\n")
     
     # 扫描论文目录
-    if not scan_papers():
+    papers = scan_papers()
+    if not papers:
         return False
     
     # 生成汇总文档
-    if not generate_summary():
+    if not generate_summary(papers):
         return False
     
     print("\n工作流2执行完成！")
     print("\n执行结果汇总：")
     print("1. 扫描结果：")
-    print(f"   - 扫描目录：{config['directories']['papers']}")
+    print(f"   - 扫描目录：{load_config()['directories']['papers']}")
     print(f"   - 文件类型：PDF")
     print("\n2. 生成的文件：")
     print("   - 汇总文档：output/paper_summary.md")
@@ -4,7 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from pathlib import Path
 import yaml
-from scripts.preprocessing.validate_pdf import validate_pdf
+from scripts.preprocessing.validate_pdf import open_validated_pdf
 from scripts.preprocessing.extract_text import extract_text
 from scripts.preprocessing.preprocess_text import preprocess_text
 from scripts.analysis.prepare_analysis_rules import prepare_analysis_rules
@@ -25,43 +25,54 @@ def load_config():
         print(f"加载配置文件时出错：{str(e)}")
         return None
 
-def analyze_single_paper(pdf_path):
+def analyze_single_paper(pdf_path,
+                         text_dir="output/analysis/text",
+                         rules_dir="output/analysis/rules",
+                         report_dir="output/analysis/report"):
     """分析单篇论文"""
+    text_file = os.path.join(text_dir, "extracted_text.txt")
+    preprocessed_file = os.path.join(text_dir, "preprocessed_text.txt")
     try:
         print(f"\n开始分析论文：{pdf_path}")
         
         # 1. 验证PDF文件
         print("\n步骤1：验证PDF文件")
-        if not validate_pdf(pdf_path):
+        source = open_validated_pdf(pdf_path)
+        if source is None:
             print("PDF文件验证失败！")
             return False
         print("PDF文件验证成功！")
         
-        # 2. 提取文本
+        # 2. 提取文本（复用验证时打开的文件映射）
         print("\n步骤2：提取文本内容")
-        if not extract_text(pdf_path):
+        with source:
+            extracted = extract_text(source.path, output_file=text_file,
+                                     report_file=os.path.join(report_dir, "extraction_result.md"),
+                                     source=source)
+        if not extracted:
             print("文本提取失败！")
             return False
         print("文本提取成功！")
         
         # 3. 预处理文本
         print("\n步骤3：预处理文本")
-        text_file = "output/analysis/text/extracted_text.txt"
-        if not preprocess_text(text_file):
+        if not preprocess_text(text_file, output_file=preprocessed_file,
+                               report_file=os.path.join(report_dir, "preprocessing_result.md")):
             print("文本预处理失败！")
             return False
         print("文本预处理成功！")
         
         # 4. 准备分析规则
         print("\n步骤4：准备分析规则")
-        if not prepare_analysis_rules():
+        success, rules_file = prepare_analysis_rules(rules_dir)
+        if not success:
             print("规则准备失败！")
             return False
         print("规则准备成功！")
         
         # 5. 分析论文
         print("\n步骤5：分析论文")
-        if not analyze_paper():
+        if not analyze_paper(preprocessed_file, rules_file, report_dir):
             print("论文分析失败！")
             return False
         print("论文分析成功！")
@@ -124,6 +135,7 @@ def main():
     print("\n2. 生成的文件：")
     print("   - 提取文本：output/analysis/text/extracted_text.txt")
     print("   - 预处理文本：output/analysis/text/preprocessed_text.txt")
+    print("   - 预处理区间：output/analysis/text/preprocessed_text.txt.spans.json")
     print("   - 分析规则：output/analysis/rules/analysis_rules.json")
     print("   - 分析报告：output/analysis/report/analysis_report.md")
     print("   - 分析结果：output/analysis/report/analysis_results.json")
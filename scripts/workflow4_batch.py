@@ -41,9 +41,9 @@ def run_batch_process():
             
         print(f"\n找到 {len(pdf_files)} 个待处理文件")
         
-        # 添加任务到队列
-        for paper in pdf_files:
-            processor.add_task(paper)
+        # 添加任务到队列：未变化的论文沿用上次结果，预检未通过的论文直接记为失败
+        queued = processor.queue_papers(pdf_files)
+        print(f"加入任务队列：{queued} 个")
             
         # 启动处理
         processor.start()
@@ -74,8 +74,12 @@ def main():
     print("\n2. 生成的文件：")
     print("   - 批处理结果：output/analysis/report/batch/batch_results.json")
     print("   - 批处理报告：output/analysis/report/batch/batch_report.md")
-    print("   - 分析报告：output/analysis/report/analysis_report.md")
-    print("   - 分析结果：output/analysis/report/analysis_results.json")
+    print("   - 论文工作目录：output/analysis/workspaces/<论文ID>/")
+    print("     * 提取文本：text/extracted_text.txt")
+    print("     * 预处理文本：text/preprocessed_text.txt")
+    print("     * 预处理区间：text/preprocessed_text.txt.spans.json")
+    print("     * 分析报告：report/analysis_report.md")
+    print("     * 分析结果：report/analysis_results.json")
     print("\n3. 临时文件：")
     print("   - 文本文件：output/analysis/text/")
     print("   - 分析规则：output/analysis/rules/")